@@ -0,0 +1,204 @@
+import asyncio
+import functools
+import json
+import logging
+import mimetypes
+import os
+
+import jinja2
+
+from assets import (
+  Answers,
+  StaticAsset,
+  load_dictionary,
+  parse_accept_encoding,
+  parse_range,
+)
+
+# The clone's routes as a plain ASGI app, for uvicorn or hypercorn (see
+# serve.py). Everything is loaded into memory up front, and reloaded in the
+# background when words.bin changes on disk.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_FOLDER = os.path.join(ROOT, 'static')
+TEMPLATE = os.path.join(ROOT, 'templates', 'index.html')
+
+ASSET_MAX_AGE = int(os.environ.get('ASSET_MAX_AGE', 365 * 24 * 60 * 60))
+RELOAD_INTERVAL = float(os.environ.get('RELOAD_INTERVAL', 2))
+
+logger = logging.getLogger(__name__)
+
+class State:
+  # Everything a request needs, swapped as a whole on reload so in-flight
+  # requests keep a consistent view.
+  def __init__(self, static_folder):
+    words_path = os.path.join(static_folder, 'words.bin')
+    self.mtime = os.stat(words_path).st_mtime
+    word_list, self.words, self.indices = load_dictionary(words_path)
+    self.answers = Answers(os.path.join(static_folder, 'answers.bin'),
+      word_list)
+    self.assets = {}
+    for path, dirs, files in os.walk(static_folder):
+      for name in files:
+        filename = os.path.join(path, name)
+        url = '/static/' + os.path.relpath(filename, static_folder).replace(
+          os.sep, '/')
+        if name.endswith(('.br', '.gz')) and os.path.exists(filename[:-3]):
+          continue
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.assets[url] = StaticAsset(filename, mimetype)
+    with open(TEMPLATE, 'r') as fp:
+      html = jinja2.Template(fp.read()).render(
+        url_for=lambda endpoint, filename: '/static/' + filename)
+    self.index = html.encode('utf-8')
+
+class App:
+  def __init__(self, static_folder=STATIC_FOLDER,
+      reload_interval=RELOAD_INTERVAL):
+    self.static_folder = static_folder
+    self.reload_interval = reload_interval
+    self.state = State(static_folder)
+    self._watcher = None
+
+  async def __call__(self, scope, receive, send):
+    if scope['type'] == 'lifespan':
+      await self.lifespan(receive, send)
+    elif scope['type'] == 'http':
+      await self.http(scope, send)
+
+  async def lifespan(self, receive, send):
+    while True:
+      message = await receive()
+      if message['type'] == 'lifespan.startup':
+        if self.reload_interval:
+          self._watcher = asyncio.ensure_future(self.watch())
+        await send({'type': 'lifespan.startup.complete'})
+      elif message['type'] == 'lifespan.shutdown':
+        if self._watcher is not None:
+          self._watcher.cancel()
+        await send({'type': 'lifespan.shutdown.complete'})
+        return
+
+  async def watch(self):
+    loop = asyncio.get_running_loop()
+    words_path = os.path.join(self.static_folder, 'words.bin')
+    while True:
+      await asyncio.sleep(self.reload_interval)
+      try:
+        if os.stat(words_path).st_mtime == self.state.mtime:
+          continue
+        self.state = await loop.run_in_executor(None, State,
+          self.static_folder)
+        logger.info("Reloaded %s.", words_path)
+      except Exception:
+        # Most likely a partially written file, keep serving the old one and
+        # try again next time.
+        logger.exception("Failed to reload %s.", words_path)
+
+  async def http(self, scope, send):
+    state = self.state
+    path = scope['path']
+    headers = dict(scope['headers'])
+    if scope['method'] == 'HEAD':
+      send = functools.partial(send_head, send)
+    if scope['method'] not in ('GET', 'HEAD'):
+      await respond(send, 405, b'', [(b'allow', b'GET, HEAD')])
+    elif path == '/':
+      await respond(send, 200, state.index,
+        [(b'content-type', b'text/html; charset=utf-8')])
+    elif path.startswith('/api/valid/'):
+      word = path[len('/api/valid/'):].lower()
+      await respond_json(send, 200, {'word': word, 'valid': word in state.words})
+    elif path.startswith('/api/index/'):
+      word = path[len('/api/index/'):].lower()
+      index = state.indices.get(word) if word in state.words else None
+      await respond_json(send, 404 if index is None else 200,
+        {'word': word, 'index': index})
+    elif path.startswith('/api/answer/'):
+      await self.answer(send, state.answers, path[len('/api/answer/'):])
+    elif path in state.assets:
+      await self.asset(send, state.assets[path], headers)
+    else:
+      await respond(send, 404, b'Not Found', [(b'content-type', b'text/plain')])
+
+  async def answer(self, send, answers, day):
+    # Same as index.py, days after today are not given out.
+    today, today_word = answers.answer_today()
+    if day == 'today':
+      day, word = today, today_word
+    else:
+      try:
+        day = int(day)
+      except ValueError:
+        await respond_json(send, 400, {'day': day, 'word': None})
+        return
+      if day > today:
+        await respond_json(send, 403, {'day': day, 'word': None})
+        return
+      word = today_word if day == today else answers.answer(day)
+    if word is None:
+      await respond_json(send, 404, {'day': day, 'word': None})
+      return
+    max_age = (answers.seconds_until_tomorrow() if day == today
+      else ASSET_MAX_AGE)
+    await respond_json(send, 200, {'day': day, 'word': word},
+      [(b'cache-control', 'public, max-age={}'.format(max_age).encode('ascii'))])
+
+  async def asset(self, send, asset, headers):
+    accepted = parse_accept_encoding(
+      headers.get(b'accept-encoding', b'').decode('latin-1'))
+    # As in index.py, ranges are always of the uncompressed file.
+    encoding = 'identity' if b'range' in headers else asset.negotiate(accepted)
+    etag = '"{}"'.format(asset.etags[encoding]).encode('ascii')
+    response_headers = [
+      (b'content-type', asset.mimetype.encode('ascii')),
+      (b'etag', etag),
+      (b'vary', b'Accept-Encoding'),
+      (b'accept-ranges', b'bytes'),
+      # As in index.py, revalidated each time as the URLs are not versioned.
+      (b'cache-control', b'public, no-cache'),
+    ]
+    if encoding != 'identity':
+      response_headers.append((b'content-encoding', encoding.encode('ascii')))
+
+    if_none_match = [x.strip() for x in
+      headers.get(b'if-none-match', b'').split(b',')]
+    if_none_match = [x[2:] if x.startswith(b'W/') else x for x in if_none_match]
+    if etag in if_none_match or b'*' in if_none_match:
+      await respond(send, 304, b'', response_headers)
+      return
+
+    body = asset.variants[encoding]
+    # If-Range only allows the range if the client's copy is still current.
+    if b'range' in headers and headers.get(b'if-range', etag) == etag:
+      try:
+        byte_range = parse_range(headers[b'range'].decode('latin-1'), len(body))
+      except ValueError:
+        await respond(send, 416, b'', response_headers + [(b'content-range',
+          'bytes */{}'.format(len(body)).encode('ascii'))])
+        return
+      if byte_range is not None:
+        start, end = byte_range
+        await respond(send, 206, body[start:end], response_headers + [
+          (b'content-range', 'bytes {}-{}/{}'.format(
+            start, end - 1, len(body)).encode('ascii'))])
+        return
+    await respond(send, 200, body, response_headers)
+
+async def respond(send, status, body, headers):
+  headers = headers + [(b'content-length', str(len(body)).encode('ascii'))]
+  await send({'type': 'http.response.start', 'status': status,
+    'headers': headers})
+  await send({'type': 'http.response.body', 'body': body})
+
+async def send_head(send, message):
+  # Same headers, including the content-length, but no body.
+  if message['type'] == 'http.response.body':
+    message = dict(message, body=b'')
+  await send(message)
+
+async def respond_json(send, status, data, headers=()):
+  await respond(send, status, json.dumps(data).encode('utf-8'),
+    [(b'content-type', b'application/json')] + list(headers))
+
+app = App()
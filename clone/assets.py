@@ -0,0 +1,137 @@
+import datetime
+import gzip
+import hashlib
+import os
+
+from wordle_trie import PerfectHash, WordleHuffmanTrie, answer_index
+
+# Shared by the Flask (index.py) and ASGI (asgi.py) apps.
+
+# Content encodings in order of preference, with their file suffixes.
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# Day zero of the clone's schedule, see today_offset() in static/src/index.js.
+EPOCH = datetime.date(2021, 6, 19)
+
+# Returns the words in index order, a set to check guesses against, and a
+# perfect hash from each word to its index, a few bits per word rather than a
+# dict of every word.
+def load_dictionary(filename):
+  words = WordleHuffmanTrie().decode(filename)
+  return (words, frozenset(words),
+    PerfectHash.build(words, range(1, len(words) + 1)))
+
+class Answers:
+  # Maps days to answers with answers.bin and the decoded (index ordered) word
+  # list, caching today's answer until the date changes.
+  def __init__(self, filename, words):
+    with open(filename, 'rb') as fp:
+      self.data = fp.read()
+    self.words = words
+    self._today = (None, None)
+
+  @staticmethod
+  def today():
+    return (datetime.date.today() - EPOCH).days
+
+  def answer(self, day):
+    index = answer_index(self.data, day)
+    if index is None or not 0 < index <= len(self.words):
+      return None
+    return self.words[index - 1]
+
+  def answer_today(self):
+    day = self.today()
+    if self._today[0] != day:
+      self._today = (day, self.answer(day))
+    return self._today
+
+  @staticmethod
+  def seconds_until_tomorrow():
+    now = datetime.datetime.now()
+    tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(1),
+      datetime.time())
+    return max(1, int((tomorrow - now).total_seconds()))
+
+def compress(encoding, data):
+  if encoding == 'gzip':
+    return gzip.compress(data, 9, mtime=0)
+  try:
+    import brotli
+  except ImportError:
+    return None
+  return brotli.compress(data)
+
+def parse_accept_encoding(header):
+  accepted = {}
+  for item in header.split(','):
+    encoding, *params = [x.strip() for x in item.split(';')]
+    quality = 1.0
+    for param in params:
+      if param.startswith('q='):
+        try:
+          quality = float(param[2:])
+        except ValueError:
+          quality = 0.0
+    if encoding:
+      accepted[encoding.lower()] = quality
+  return accepted
+
+def parse_range(header, length):
+  # A single byte range as (start, end), end exclusive. Returns None for
+  # anything else, which is served whole, and raises ValueError if the range
+  # cannot be satisfied.
+  unit, _, spec = header.partition('=')
+  first, sep, last = spec.strip().partition('-')
+  if unit.strip().lower() != 'bytes' or ',' in spec or not sep:
+    return None
+  try:
+    if first:
+      start = int(first)
+      end = int(last) + 1 if last else length
+    else:
+      start, end = length - int(last), length
+  except ValueError:
+    return None
+  start, end = max(start, 0), min(end, length)
+  if start >= end:
+    raise ValueError("Unsatisfiable range {!r}.".format(header))
+  return start, end
+
+class StaticAsset:
+  # A file held in memory with its precompressed variants. Siblings such as
+  # words.bin.br are used if they are at least as new as the file, otherwise
+  # variants are compressed on load.
+  def __init__(self, filename, mimetype='application/octet-stream'):
+    with open(filename, 'rb') as fp:
+      data = fp.read()
+    mtime = os.stat(filename).st_mtime
+    self.mimetype = mimetype
+    self.variants = {'identity': data}
+    for encoding, suffix in ENCODINGS:
+      sibling = filename + suffix
+      if os.path.exists(sibling) and os.stat(sibling).st_mtime >= mtime:
+        with open(sibling, 'rb') as fp:
+          variant = fp.read()
+      else:
+        variant = compress(encoding, data)
+      if variant is not None and len(variant) < len(data):
+        self.variants[encoding] = variant
+    self.etags = {encoding: hashlib.sha256(variant).hexdigest()[:32]
+      for encoding, variant in self.variants.items()}
+
+  # accepted maps encodings to their quality, like werkzeug's accept_encodings
+  # or parse_accept_encoding.
+  def negotiate(self, accepted):
+    best = 'identity'
+    for encoding, suffix in ENCODINGS:
+      if encoding not in self.variants:
+        continue
+      quality = accepted[encoding] if encoding in accepted else 0
+      best_quality = accepted[best] if best in accepted else 0
+      if quality and quality > best_quality:
+        best = encoding
+      elif quality and quality == best_quality and (
+          len(self.variants[encoding]) < len(self.variants[best])):
+        best = encoding
+    return best
@@ -1,10 +1,87 @@
+import gc
+import os
+
 from flask import (
   Flask,
+  Response,
+  jsonify,
   render_template,
+  request,
 )
 
+from assets import Answers, StaticAsset, load_dictionary
+
 app = Flask(__name__)
+app.config.setdefault('ASSET_MAX_AGE', 365 * 24 * 60 * 60)
+
+WORDS_PATH = os.path.join(app.static_folder, 'words.bin')
+ANSWERS_PATH = os.path.join(app.static_folder, 'answers.bin')
+
+ASSETS = {name: StaticAsset(os.path.join(app.static_folder, name))
+  for name in ('words.bin', 'answers.bin', 'words.chunked.bin')}
+
+# Decoded once at import, so a pre-forking server (e.g. gunicorn --preload)
+# shares one copy between workers. Freezing keeps the garbage collector from
+# touching, and so copying, those pages in each worker.
+WORD_LIST, WORDS, INDICES = load_dictionary(WORDS_PATH)
+ANSWERS = Answers(ANSWERS_PATH, WORD_LIST)
+gc.freeze()
 
 @app.route('/')
 def index():
   return render_template("index.html")
+
+@app.route(
+  '/static/<any("words.bin", "answers.bin", "words.chunked.bin"):name>')
+def asset(name):
+  asset = ASSETS[name]
+  # Ranges are served from the uncompressed file, so a client can pick chunks
+  # out of words.chunked.bin using the offsets in its index.
+  encoding = 'identity' if request.range else asset.negotiate(
+    request.accept_encodings)
+  response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+  if encoding != 'identity':
+    response.content_encoding = encoding
+  response.vary.add('Accept-Encoding')
+  response.set_etag(asset.etags[encoding])
+  # The URLs are not versioned, so clients revalidate each time and get a 304
+  # while the dictionary is unchanged.
+  response.cache_control.public = True
+  response.cache_control.no_cache = True
+  return response.make_conditional(request, accept_ranges=True,
+    complete_length=len(asset.variants[encoding]))
+
+@app.route('/api/valid/<word>')
+def valid(word):
+  word = word.lower()
+  return jsonify(word=word, valid=word in WORDS)
+
+@app.route('/api/index/<word>')
+def word_index(word):
+  word = word.lower()
+  if word not in WORDS:
+    return jsonify(word=word, index=None), 404
+  return jsonify(word=word, index=INDICES.get(word))
+
+@app.route('/api/answer/<day>')
+def answer(day):
+  # day is days since the epoch, as in answers.bin, or "today". Days after
+  # today are not given out.
+  today, today_word = ANSWERS.answer_today()
+  if day == 'today':
+    day, word = today, today_word
+  else:
+    try:
+      day = int(day)
+    except ValueError:
+      return jsonify(day=day, word=None), 400
+    if day > today:
+      return jsonify(day=day, word=None), 403
+    word = today_word if day == today else ANSWERS.answer(day)
+  if word is None:
+    return jsonify(day=day, word=None), 404
+  response = jsonify(day=day, word=word)
+  response.cache_control.public = True
+  response.cache_control.max_age = (ANSWERS.seconds_until_tomorrow()
+    if day == today else app.config['ASSET_MAX_AGE'])
+  return response
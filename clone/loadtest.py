@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import collections
+import os
+import socket
+import subprocess
+import sys
+import time
+
+# A small keep-alive HTTP/1.1 load generator. With --compare it starts the
+# Flask development server (as start.sh does) and the ASGI app (serve.py) and
+# reports the requests per second of each.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATHS = ['/api/valid/crane', '/api/valid/zzzzz', '/api/index/crane']
+
+async def read_response(reader):
+  head = await reader.readuntil(b'\r\n\r\n')
+  lines = head.decode('latin-1').split('\r\n')
+  status = int(lines[0].split()[1])
+  headers = {}
+  for line in lines[1:]:
+    if ':' in line:
+      name, value = line.split(':', 1)
+      headers[name.strip().lower()] = value.strip()
+  length = int(headers.get('content-length', 0))
+  if length:
+    await reader.readexactly(length)
+  keep_alive = headers.get('connection', '').lower() != 'close' and (
+    lines[0].startswith('HTTP/1.1'))
+  return status, keep_alive
+
+async def client(host, port, paths, deadline, counts):
+  reader = writer = None
+  i = 0
+  while time.monotonic() < deadline:
+    if writer is None:
+      reader, writer = await asyncio.open_connection(host, port)
+    path = paths[i % len(paths)]
+    i += 1
+    writer.write('GET {} HTTP/1.1\r\nHost: {}\r\n\r\n'.format(
+      path, host).encode('ascii'))
+    try:
+      status, keep_alive = await read_response(reader)
+    except (asyncio.IncompleteReadError, ConnectionError):
+      counts['error'] += 1
+      writer.close()
+      writer = None
+      continue
+    counts[status] += 1
+    if not keep_alive:
+      writer.close()
+      writer = None
+  if writer is not None:
+    writer.close()
+
+async def load(host, port, paths, connections, duration):
+  counts = collections.Counter()
+  deadline = time.monotonic() + duration
+  s = time.monotonic()
+  await asyncio.gather(*[client(host, port, paths, deadline, counts)
+    for i in range(connections)])
+  return counts, time.monotonic() - s
+
+def run(host, port, paths, connections, duration):
+  counts, elapsed = asyncio.run(load(host, port, paths, connections, duration))
+  total = sum(v for k, v in counts.items() if k != 'error')
+  return total / elapsed, counts
+
+def free_port():
+  with socket.socket() as sock:
+    sock.bind(('127.0.0.1', 0))
+    return sock.getsockname()[1]
+
+def wait_for(port, timeout=30):
+  deadline = time.monotonic() + timeout
+  while time.monotonic() < deadline:
+    try:
+      socket.create_connection(('127.0.0.1', port), timeout=1).close()
+      return
+    except OSError:
+      time.sleep(0.1)
+  raise RuntimeError("Server on port {} did not start.".format(port))
+
+def start_flask(port):
+  env = dict(os.environ, FLASK_APP='index.py')
+  return subprocess.Popen([sys.executable, '-m', 'flask', 'run',
+    '--host', '127.0.0.1', '--port', str(port)], cwd=ROOT, env=env,
+    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def start_asgi(port, workers):
+  return subprocess.Popen([sys.executable, 'serve.py', '--host', '127.0.0.1',
+    '--port', str(port), '--workers', str(workers), '--log-level', 'warning'],
+    cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def report(name, rate, counts):
+  print("{:<12} {:10.0f} req/s  {}".format(name, rate, dict(counts)))
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog='loadtest.py')
+  parser.add_argument('url', nargs='?', default='127.0.0.1:7000',
+    help="host:port to load, ignored with --compare.")
+  parser.add_argument('-c', '--connections', type=int, default=32)
+  parser.add_argument('-d', '--duration', type=float, default=5)
+  parser.add_argument('-w', '--workers', type=int, default=1,
+    help="ASGI workers with --compare.")
+  parser.add_argument('--path', action='append', dest='paths')
+  parser.add_argument('--compare', action='store_true',
+    help="Start and load the Flask dev server and the ASGI app.")
+  args = parser.parse_args(argv)
+  paths = args.paths or DEFAULT_PATHS
+
+  if not args.compare:
+    host, port = args.url.rsplit(':', 1)
+    report(args.url, *run(host, int(port), paths, args.connections,
+      args.duration))
+    return 0
+
+  rates = {}
+  for name, start in [('flask', start_flask),
+      ('asgi', lambda port: start_asgi(port, args.workers))]:
+    port = free_port()
+    server = start(port)
+    try:
+      wait_for(port)
+      rates[name], counts = run('127.0.0.1', port, paths, args.connections,
+        args.duration)
+      report(name, rates[name], counts)
+    finally:
+      server.terminate()
+      server.wait()
+  print("ASGI speedup: {:0.1f}x".format(rates['asgi'] / rates['flask']))
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,62 @@
+import argparse
+import os
+import sys
+
+# Runs the ASGI app (asgi.py) under uvicorn or hypercorn, whichever is
+# installed unless one is chosen.
+
+SERVERS = ('uvicorn', 'hypercorn')
+
+def find_server():
+  for server in SERVERS:
+    try:
+      __import__(server)
+      return server
+    except ImportError:
+      pass
+  return None
+
+def run_uvicorn(args):
+  import uvicorn
+
+  uvicorn.run('asgi:app', host=args.host, port=args.port, workers=args.workers,
+    log_level=args.log_level, access_log=False, lifespan='on')
+
+def run_hypercorn(args):
+  from hypercorn.config import Config
+  from hypercorn.run import run
+
+  config = Config()
+  config.application_path = 'asgi:app'
+  config.bind = ['{}:{}'.format(args.host, args.port)]
+  config.workers = args.workers
+  config.loglevel = args.log_level
+  run(config)
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog='serve.py')
+  parser.add_argument('--server', choices=SERVERS, default=find_server())
+  parser.add_argument('--host', default='0.0.0.0')
+  parser.add_argument('--port', type=int, default=7000)
+  parser.add_argument('-w', '--workers', type=int,
+    default=int(os.environ.get('WEB_CONCURRENCY', 1)))
+  parser.add_argument('--reload-interval', type=float,
+    help="Seconds between checks for a new words.bin, 0 to disable.")
+  parser.add_argument('--log-level', default='info')
+  args = parser.parse_args(argv)
+  if args.server is None:
+    parser.error("Install uvicorn or hypercorn.")
+
+  # Workers import asgi.py themselves, so settings go via the environment.
+  os.chdir(os.path.dirname(os.path.abspath(__file__)))
+  sys.path.insert(0, os.getcwd())
+  if args.reload_interval is not None:
+    os.environ['RELOAD_INTERVAL'] = str(args.reload_interval)
+  if args.server == 'uvicorn':
+    run_uvicorn(args)
+  else:
+    run_hypercorn(args)
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -8,6 +8,7 @@ class BitReader {
     this.buf = new Int8Array(array_buffer);
     this.i = 0;
     this.j = 7;
+    this.codes = new WeakMap();
   }
 
   read_bit() {
@@ -62,12 +63,27 @@ class BitReader {
     }
   }
 
+  /*
+   * Read a Huffman code, returning its symbol.
+   *
+   * Codes are matched as (length, value) numbers rather than strings built a
+   * bit at a time, with each table's lookup built on first use.
+   */
   read_huff(table) {
-    let buf = '';
-    for (let i = 0;; ++i) {
-      buf += this.read_bit()
-      if (buf in table) {
-        return table[buf];
+    let codes = this.codes.get(table);
+    if (codes === undefined) {
+      codes = new Map();
+      for (const code in table) {
+        codes.set(code.length * 4294967296 + parseInt(code, 2), table[code]);
+      }
+      this.codes.set(table, codes);
+    }
+    let value = 0;
+    for (let length = 1;; ++length) {
+      value = value * 2 + this.read_bit();
+      const symbol = codes.get(length * 4294967296 + value);
+      if (symbol !== undefined) {
+        return symbol;
       }
     }
   }
@@ -1,4 +1,3 @@
-from bitstring import BitArray
 import collections
 import functools
 import itertools
@@ -76,9 +75,13 @@ def convert_trie_to_bits(trie, bit_trie, tables, depth=0, smart=False):
     convert_trie_to_bits(v, bit_trie, tables, depth+1, smart=smart)
 
 class BitStream:
+  # Accepts a BitArray, or plain bytes when only reading.
   def __init__(self, bit_array, char_map=None):
     self.bits = bit_array
-    self.bin = self.bits.bin
+    if hasattr(bit_array, 'bin'):
+      self.bin = bit_array.bin
+    else:
+      self.bin = ''.join(format(byte, '08b') for byte in bit_array)
     self.i = 0
     self.char_map = char_map
 
@@ -103,16 +106,13 @@ class BitStream:
     return int(self.read(num_bits), 2)
 
   def read_varint(self, table):
-    buf = ''
-    i = 0
-    while True:
-      buf += str(self.read(1))
-      if buf in table.keys():
-        return table[buf]
-      i += 1
-      #if i > max(map(len, table.keys())):
-      #  print(i, buf, table.keys())
-      #  sys.exit()
+    start = self.i
+    for end in range(start + 1, len(self.bin) + 1):
+      code = self.bin[start:end]
+      if code in table:
+        self.i = end
+        return table[code]
+    raise ValueError("No Huffman code at bit {}.".format(start))
 
   def __len__(self):
     return len(self.bits)
@@ -172,6 +172,9 @@ def decode(bits, symbols, use_trie):
   return words
 
 if __name__ == "__main__":
+  # Only encoding needs bitstring, decode() reads plain bytes.
+  from bitstring import BitArray
+
   with open('wordle.json', 'r') as fp:
     words = json.load(fp)
 
@@ -317,7 +320,7 @@ if __name__ == "__main__":
   print("")
 
   s = time.monotonic()
-  words = decode(bits.bits, list(INT_MAP.keys()), use_trie)
+  words = decode(bits.bits.tobytes(), list(INT_MAP.keys()), use_trie)
   print("")
   print("Num Words Decoded:", len(words))
   print("First Word:", words[0])
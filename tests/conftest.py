@@ -0,0 +1,35 @@
+import random
+import string
+
+import pytest
+
+from wordle_trie import ALPHABET, WordleHuffmanTrie
+
+@pytest.fixture(scope='session')
+def variable_words():
+  # Words of 2 to 11 letters of a-z where many are prefixes of others, as in
+  # a real variable length dictionary. Weighted letters give the child counts
+  # a spread of frequencies, some only seen on nodes ending a word.
+  rng = random.Random(0)
+  letters = string.ascii_lowercase
+  weights = [1 / (i + 1) for i in range(len(letters))]
+  words = set()
+  while len(words) < 2000:
+    word = ''.join(rng.choices(letters, weights, k=rng.randint(2, 11)))
+    words.add(word)
+    words.add(word[:rng.randint(2, len(word))])
+  return sorted(words)
+
+@pytest.fixture(scope='session')
+def variable_bin(variable_words):
+  # A raw variable length dictionary, without an index. Raw files are read as
+  # a-z.
+  trie = WordleHuffmanTrie(variable_length=True)
+  trie.encode(variable_words, list(ALPHABET))
+  return trie.tobytes()
+
+@pytest.fixture(scope='session')
+def variable_container(variable_words):
+  trie = WordleHuffmanTrie(variable_length=True)
+  trie.encode(variable_words)
+  return trie.tocontainer()
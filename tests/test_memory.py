@@ -0,0 +1,73 @@
+import pytest
+
+from wordle_trie import PerfectHash, WordleHuffmanTrie, deep_sizeof
+
+def _load(data, budget=None):
+  trie = WordleHuffmanTrie(variable_length=True)
+  trie.load(data, budget=budget)
+  return trie
+
+@pytest.mark.parametrize('source', ['variable_bin', 'variable_container'])
+def test_load_within_budget(request, source):
+  data = request.getfixturevalue(source)
+  mapped = _load(data, 0).memory_report()['total']
+  bits = _load(data).memory_report()['total']
+  assert mapped < bits
+  # Either side of the raw format's tables, which are counted once read.
+  for budget in range(mapped, bits + 2000, 500):
+    trie = _load(data, budget)
+    assert trie.memory_report()['total'] <= budget
+    if budget >= bits + 1000:
+      assert trie.representation == 'bits'
+
+def test_load_path_within_budget(tmp_path, variable_bin):
+  path = tmp_path / 'words.bin'
+  path.write_bytes(variable_bin)
+  bits = _load(str(path)).memory_report()['total']
+  trie = _load(str(path), bits - 1)
+  assert trie.representation == 'mapped'
+  assert trie.memory_report()['total'] <= bits - 1
+
+def test_below_mapped_gets_lightest(variable_bin):
+  trie = _load(variable_bin, 0)
+  assert trie.representation == 'mapped'
+  assert list(trie.iter_words()) == _load(variable_bin).decode(variable_bin)
+
+def test_decode_over_budget_raises(variable_bin, variable_words):
+  trie = WordleHuffmanTrie(variable_length=True)
+  with pytest.raises(MemoryError):
+    trie.decode(variable_bin, budget=_load(variable_bin).memory_report()[
+      'total'])
+  assert list(trie.iter_words()) == variable_words
+  words = WordleHuffmanTrie(variable_length=True).decode(variable_bin,
+    budget=10 ** 9)
+  assert words == variable_words
+
+def test_iter_words_keeps_its_cursor(variable_bin, variable_words):
+  trie = _load(variable_bin, 0)
+  for i, word in enumerate(trie.iter_words()):
+    assert word == variable_words[i]
+    # Lookups between words must not move the iterator.
+    if i % 100 == 0:
+      assert trie.index_of(variable_words[-1]) == len(variable_words)
+      assert not trie.contains(word + 'zz')
+
+def test_views_count_their_buffer():
+  data = bytes(10000)
+  assert deep_sizeof(memoryview(data)[10:20]) >= len(data)
+  # Counted once however many views share it.
+  views = [memoryview(data), memoryview(data)[5:]]
+  assert deep_sizeof(views) < 2 * len(data)
+
+def test_perfect_hash_owns_its_data(variable_words):
+  mph = PerfectHash.build(variable_words, range(1, len(variable_words) + 1))
+  assert mph.memory_report()['total'] >= len(mph.tobytes())
+
+def test_container_bytes_counted(tmp_path, variable_container):
+  # Bytes are held by the dictionary, a mapped file is not heap.
+  trie = _load(variable_container)
+  assert trie.memory_report()['container'] >= len(variable_container)
+  path = tmp_path / 'words.bin'
+  path.write_bytes(variable_container)
+  trie = _load(str(path))
+  assert trie.memory_report()['container'] < len(variable_container)
@@ -0,0 +1,117 @@
+import os
+import random
+
+import pytest
+
+import wordle_trie
+
+from wordle_trie import ALPHABET, AnswerSchedule, WordleHuffmanTrie
+from wordle_trie.schedule import HEADER
+
+def _round_trip(schedule):
+  return AnswerSchedule(memoryview(schedule.tobytes()))
+
+def test_width_one():
+  schedule = AnswerSchedule.build([1, 1, 1], 10, 1)
+  assert schedule.width == 1
+  assert len(schedule.tobytes()) == HEADER.size + 1
+  assert _round_trip(schedule).indices() == [1, 1, 1]
+
+def test_width_sixteen():
+  num_words = 40000
+  indices = random.Random(0).sample(range(1, num_words + 1), 500)
+  indices += [1, num_words]
+  schedule = AnswerSchedule.build(indices, 19000, num_words)
+  assert schedule.width == 16
+  assert len(schedule.tobytes()) == HEADER.size + 2 * len(indices)
+  assert _round_trip(schedule).indices() == indices
+
+@pytest.mark.parametrize('num_words', [2, 3, 12972, 2 ** 20])
+def test_odd_widths(num_words):
+  # Fields that straddle bytes.
+  indices = [num_words, 1] * 9 + [num_words // 2 + 1]
+  schedule = _round_trip(AnswerSchedule.build(indices, 0, num_words))
+  assert schedule.width == num_words.bit_length()
+  assert schedule.indices() == indices
+
+def test_single_day():
+  schedule = _round_trip(AnswerSchedule.build([5], 19000, 8))
+  assert len(schedule) == 1
+  assert schedule.answer_for_day(19000) == 5
+  assert schedule.answer_for_day(18999) is None
+  assert schedule.answer_for_day(19001) is None
+
+@pytest.mark.parametrize('day_offset', [0, 19000, 2 ** 32 - 4])
+def test_day_offset_boundaries(day_offset):
+  schedule = _round_trip(AnswerSchedule.build([3, 1, 4], day_offset, 4))
+  assert schedule.day_offset == day_offset
+  assert schedule.answer_for_day(day_offset) == 3
+  assert schedule.answer_for_day(day_offset + 2) == 4
+  assert schedule.answer_for_day(day_offset - 1) is None
+  assert schedule.answer_for_day(day_offset + 3) is None
+
+def test_empty():
+  schedule = _round_trip(AnswerSchedule.build([], 19000, 100))
+  assert len(schedule) == 0
+  assert schedule.answer_for_day(19000) is None
+
+def test_invalid():
+  with pytest.raises(ValueError):
+    AnswerSchedule.build([0], 0, 10)
+  with pytest.raises(ValueError):
+    AnswerSchedule.build([11], 0, 10)
+  data = AnswerSchedule.build([1, 2, 3], 0, 10).tobytes()
+  with pytest.raises(ValueError):
+    AnswerSchedule(data[:-1])
+  with pytest.raises(ValueError):
+    AnswerSchedule(data[:HEADER.size - 1])
+
+def test_memoryview_of_larger_buffer():
+  # As a container hands over its section, a slice of the whole file.
+  data = AnswerSchedule.build([2, 7, 1], 100, 7).tobytes()
+  buffer = bytearray(b'\xff' * 5 + data + b'\xff' * 5)
+  schedule = AnswerSchedule(memoryview(buffer)[5:-5])
+  assert schedule.indices() == [2, 7, 1]
+
+def test_container_section(variable_words):
+  trie = WordleHuffmanTrie(variable_length=True)
+  trie.encode(variable_words)
+  indices = random.Random(1).sample(range(1, len(variable_words) + 1), 300)
+  schedule = AnswerSchedule.build(indices, 19000, len(variable_words))
+  data = trie.tocontainer(schedule=schedule.tobytes())
+
+  loaded = WordleHuffmanTrie()
+  loaded.load(data)
+  assert loaded.schedule.indices() == indices
+  for day in (19000, 19150, 19299):
+    assert loaded.answer_for_day(day) == variable_words[
+      indices[day - 19000] - 1]
+  assert loaded.answer_for_day(18999) is None
+  assert loaded.answer_for_day(19300) is None
+
+  # Without a SCHD section there is no schedule to ask.
+  loaded.load(trie.tocontainer())
+  with pytest.raises(ValueError):
+    loaded.answer_for_day(19000)
+
+def test_full_schedule():
+  # A schedule as long as Wordle's, of distinct words of the shipped
+  # dictionary standing in for the answers, which aren't in this repository.
+  trie = WordleHuffmanTrie()
+  words = trie.decode(os.path.join(os.path.dirname(wordle_trie.__file__),
+    'words.bin'))
+  indices = random.Random(0).sample(range(1, len(words) + 1), 2315)
+  schedule = AnswerSchedule.build(indices, 19000, len(words))
+  expected = [words[x - 1] for x in indices]
+
+  raw = _round_trip(schedule)
+  assert raw.indices() == indices
+  assert [words[raw.answer_for_day(19000 + x) - 1]
+    for x in range(2315)] == expected
+
+  trie.encode(words, list(ALPHABET))
+  loaded = WordleHuffmanTrie()
+  loaded.load(trie.tocontainer(schedule=schedule.tobytes()))
+  assert [loaded.answer_for_day(19000 + x) for x in range(2315)] == expected
+  assert loaded.answer_for_day(18999) is None
+  assert loaded.answer_for_day(19000 + 2315) is None
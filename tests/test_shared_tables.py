@@ -0,0 +1,42 @@
+import pytest
+
+from wordle_trie import ALPHABET, WordleHuffmanTrie
+from wordle_trie.container import ContainerError
+
+@pytest.fixture(scope='module')
+def shared(variable_words):
+  tables = WordleHuffmanTrie()
+  tables.encode_tables(variable_words, list(ALPHABET))
+  shared = WordleHuffmanTrie()
+  shared.load_tables(tables.totables())
+  return shared
+
+@pytest.mark.parametrize('length', [2, 5, 11])
+def test_tables_fitted_to_length(shared, variable_words, length):
+  # Each length's payload is coded as with its own tables, less the tables.
+  group = [x for x in variable_words if len(x) == length]
+  alone = WordleHuffmanTrie()
+  alone.encode(group, list(ALPHABET))
+  trie = WordleHuffmanTrie()
+  trie.encode(group, None, shared=shared)
+  assert trie.payload_size == alone.payload_size
+  assert len(trie.tocontainer()) < len(alone.tocontainer())
+
+  loaded = WordleHuffmanTrie()
+  assert loaded.decode(trie.tocontainer(), tables=shared) == group
+  assert loaded.index_of(group[-1]) == len(group)
+
+def test_missing_length(shared, variable_words):
+  tables = WordleHuffmanTrie()
+  tables.encode_tables([x for x in variable_words if len(x) != 5],
+    list(ALPHABET))
+  other = WordleHuffmanTrie()
+  other.load_tables(tables.totables())
+  group = [x for x in variable_words if len(x) == 5]
+  with pytest.raises(ValueError):
+    WordleHuffmanTrie().encode(group, None, shared=other)
+  # Nor is a dictionary read with tables other than its own.
+  trie = WordleHuffmanTrie()
+  trie.encode(group, None, shared=shared)
+  with pytest.raises(ContainerError):
+    WordleHuffmanTrie().load(trie.tocontainer(), tables=other)
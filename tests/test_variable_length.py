@@ -0,0 +1,109 @@
+import pytest
+
+from wordle_trie import WordleHuffmanTrie
+
+def _prefix_misses(words):
+  # Prefixes of words that are not words themselves.
+  known = set(words)
+  return sorted({x[:i] for x in words for i in range(1, len(x))} - known)
+
+def _extension_misses(words):
+  known = set(words)
+  return sorted({x + y for x in words for y in 'ahz'} - known)
+
+@pytest.fixture(params=['scan', 'offsets', 'container', 'skips', 'mph'])
+def trie(request, variable_bin, variable_container, variable_words):
+  trie = WordleHuffmanTrie(variable_length=True)
+  if request.param == 'scan':
+    # Loaded without decoding, so there are no offsets to seek with.
+    trie.load(variable_bin)
+    assert not trie.offsets
+  elif request.param == 'offsets':
+    # Decoding a raw file records where each root subtree starts.
+    trie.decode(variable_bin)
+    assert trie.offsets
+  elif request.param == 'container':
+    trie.load(variable_container)
+    assert trie.offsets
+  else:
+    # Skips seek past subtrees off a word's path, the perfect hash only ranks
+    # known words.
+    encoder = WordleHuffmanTrie(variable_length=True)
+    encoder.encode(variable_words)
+    trie.load(encoder.tocontainer(skips=request.param == 'skips',
+      mph=request.param == 'mph'))
+  return trie
+
+def test_decode_matches_iter_words(variable_bin, variable_container,
+    variable_words):
+  for data in (variable_bin, variable_container):
+    trie = WordleHuffmanTrie(variable_length=True)
+    assert trie.decode(data) == variable_words
+    assert list(trie.iter_words()) == variable_words
+
+def test_index_of(trie, variable_words):
+  # Every word would take a while on the scan path, every tenth still covers
+  # each root subtree.
+  for i, word in list(enumerate(variable_words))[::10]:
+    assert trie.index_of(word) == i + 1
+    assert trie.contains(word)
+
+def test_prefix_misses(trie, variable_words):
+  misses = _prefix_misses(variable_words)
+  assert misses
+  for word in misses[::5]:
+    assert trie.index_of(word) is None
+    assert not trie.contains(word)
+
+def test_extension_misses(trie, variable_words):
+  for word in _extension_misses(variable_words)[::25]:
+    assert trie.index_of(word) is None
+    assert not trie.contains(word)
+
+def test_word_indices(trie, variable_words):
+  sample = variable_words[::7] + _prefix_misses(variable_words)[:50]
+  expected = [(x, i + 1) for i, x in enumerate(variable_words) if x in
+    set(sample)]
+  assert trie.word_indices(sample) == expected
+
+def test_word_at(trie, variable_words):
+  for i in range(0, len(variable_words), 37):
+    assert trie.word_at(i + 1) == variable_words[i]
+  assert trie.word_at(0) is None
+  assert trie.word_at(len(variable_words) + 1) is None
+
+def test_batched_lookups(trie, variable_words):
+  words = variable_words[::3] + _extension_misses(variable_words)[:100]
+  assert list(trie.index_of_many(words)) == [trie.index_of(x) for x in words]
+  assert list(trie.contains_many(words)) == [x in set(variable_words)
+    for x in words]
+
+@pytest.mark.parametrize('words', [
+  ['a', 'ab', 'ac'],
+  ['ab', 'abc', 'abcd', 'abd', 'b', 'bcd'],
+])
+def test_small_dictionaries(tmp_path, words):
+  # Nodes ending a word have one child fewer than their keys, every way of
+  # encoding must count them the same.
+  trie = WordleHuffmanTrie(variable_length=True)
+  trie.encode(words)
+  data = trie.tocontainer()
+  assert WordleHuffmanTrie().decode(data) == words
+
+  path = tmp_path / 'words.txt'
+  path.write_text('\n'.join(words))
+  streamed = WordleHuffmanTrie(variable_length=True)
+  streamed.encode_stream(str(path), trie.symbols)
+  assert streamed.tocontainer() == data
+
+def test_encoders_agree(tmp_path, variable_words):
+  trie = WordleHuffmanTrie(variable_length=True)
+  trie.encode(variable_words)
+  path = tmp_path / 'words.txt'
+  path.write_text('\n'.join(variable_words))
+  streamed = WordleHuffmanTrie(variable_length=True)
+  streamed.encode_stream(str(path), trie.symbols)
+  parallel = WordleHuffmanTrie(variable_length=True)
+  parallel.encode(variable_words, trie.symbols, workers=2)
+  assert streamed.tobytes() == parallel.tobytes() == trie.tobytes()
+  assert streamed.skips == parallel.skips == trie.skips
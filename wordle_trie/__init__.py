@@ -0,0 +1,42 @@
+import importlib
+
+# Submodules are imported on first attribute access so that importing the
+# package (e.g. for a lookup) does not pay for bitstring or the encoder.
+_EXPORTS = {
+  'ALPHABET': 'encoder',
+  'AnswerSchedule': 'schedule',
+  'BitReader': 'bit_reader',
+  'BloomFilter': 'filter',
+  'Container': 'container',
+  'ContainerError': 'container',
+  'Huffman': 'huffman',
+  'LevelTrie': 'levels',
+  'LoudsTrie': 'louds',
+  'MappedBitReader': 'bit_reader',
+  'PatchError': 'update',
+  'PerfectHash': 'mph',
+  'Query': 'query',
+  'Trie': 'trie',
+  'WordleHuffmanTrie': 'encoder',
+  'answer_index': 'encoder',
+  'apply_patch': 'update',
+  'decode_answers': 'encoder',
+  'deep_sizeof': 'memory',
+  'discover_alphabet': 'alphabet',
+  'encode_answers': 'encoder',
+  'normalize_lines': 'alphabet',
+  'normalize_words': 'alphabet',
+  'open_container': 'container',
+  'symbol_counts': 'encoder',
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+  if name not in _EXPORTS:
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+  module = importlib.import_module('.' + _EXPORTS[name], __name__)
+  return getattr(module, name)
+
+def __dir__():
+  return sorted(list(globals()) + __all__)
@@ -0,0 +1,120 @@
+import collections
+import struct
+import unicodedata
+
+# Serialised symbol alphabets, as stored in a container's SYMB section. The
+# first byte is the kind.
+#
+# ALPHABET_LIST:
+#   UTF-8 symbols separated by NUL bytes, in symbol id order.
+#
+# ALPHABET_RUNS:
+#   count  H  number of runs, each starting with its kind byte
+#   RUN_RANGE:   start I, length H
+#                Single code point symbols start, start+1, ..., e.g. a-z.
+#   RUN_PACKED:  count H, width B, then the UTF-8 symbols
+#                With a width each symbol is exactly that many bytes, otherwise
+#                (width 0) each is prefixed with its length as a byte.
+#
+# Runs are in symbol id order, so a-z followed by 676 bigrams (as in lesson7's
+# gram_2 map) is one range and one packed run of fixed width 2.
+ALPHABET_LIST = 0
+ALPHABET_RUNS = 1
+
+RUN_RANGE = 0
+RUN_PACKED = 1
+
+RANGE = struct.Struct('>BIH')
+PACKED = struct.Struct('>BHB')
+COUNT = struct.Struct('>H')
+
+def _runs(symbols):
+  runs = []
+  for symbol in symbols:
+    single = len(symbol) == 1
+    if runs and single and runs[-1][0] == RUN_RANGE:
+      start, length = runs[-1][1], len(runs[-1][2])
+      if ord(symbol) == start + length and length < 0xffff:
+        runs[-1][2].append(symbol)
+        continue
+    if single:
+      runs.append([RUN_RANGE, ord(symbol), [symbol]])
+    elif runs and runs[-1][0] == RUN_PACKED and len(runs[-1][2]) < 0xffff:
+      runs[-1][2].append(symbol)
+    else:
+      runs.append([RUN_PACKED, None, [symbol]])
+  return runs
+
+def encode_alphabet(symbols):
+  runs = _runs(symbols)
+  data = bytes([ALPHABET_RUNS]) + COUNT.pack(len(runs))
+  for kind, start, items in runs:
+    if kind == RUN_RANGE:
+      data += RANGE.pack(RUN_RANGE, start, len(items))
+      continue
+    encoded = [x.encode('utf-8') for x in items]
+    for symbol, x in zip(items, encoded):
+      if len(x) > 255:
+        raise ValueError("Symbol {!r} is {} bytes, symbols can be at most 255 "
+          "bytes of UTF-8.".format(symbol, len(x)))
+    widths = set(map(len, encoded))
+    width = widths.pop() if len(widths) == 1 and max(widths) < 256 else 0
+    data += PACKED.pack(RUN_PACKED, len(items), width)
+    if width:
+      data += b''.join(encoded)
+    else:
+      data += b''.join(bytes([len(x)]) + x for x in encoded)
+  return data
+
+def decode_alphabet(data):
+  data = bytes(data)
+  if not data:
+    raise ValueError("Empty alphabet.")
+  if data[0] == ALPHABET_LIST:
+    return data[1:].decode('utf-8').split('\0')
+  if data[0] != ALPHABET_RUNS:
+    raise ValueError("Unknown alphabet kind {}.".format(data[0]))
+
+  symbols = []
+  (count,) = COUNT.unpack_from(data, 1)
+  i = 1 + COUNT.size
+  for run in range(count):
+    if data[i] == RUN_RANGE:
+      kind, start, length = RANGE.unpack_from(data, i)
+      i += RANGE.size
+      symbols += [chr(x) for x in range(start, start + length)]
+    elif data[i] == RUN_PACKED:
+      kind, length, width = PACKED.unpack_from(data, i)
+      i += PACKED.size
+      for j in range(length):
+        size = width
+        if not size:
+          size = data[i]
+          i += 1
+        symbols.append(data[i:i+size].decode('utf-8'))
+        i += size
+    else:
+      raise ValueError("Unknown alphabet run {}.".format(data[i]))
+  return symbols
+
+# Words in Unicode NFC, so a letter typed precomposed (U+00E9) or as a base
+# letter and a combining mark (e, U+0301) is the same single symbol.
+def normalize_words(words):
+  return [unicodedata.normalize('NFC', x) for x in words]
+
+# The same for the lines of a word file, one at a time, stripped and skipping
+# blank ones.
+def normalize_lines(lines):
+  for line in lines:
+    line = unicodedata.normalize('NFC', line.strip())
+    if line:
+      yield line
+
+# The symbols words are made of in id order, most frequent first (ties in code
+# point order) so ids do not depend on the order of the words. Words should be
+# normalized first.
+def discover_alphabet(words):
+  counts = collections.Counter()
+  for word in words:
+    counts.update(word)
+  return sorted(counts, key=lambda x: (-counts[x], x))
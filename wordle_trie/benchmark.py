@@ -0,0 +1,265 @@
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+
+from .alphabet import discover_alphabet, normalize_words
+from .encoder import ALPHABET, WordleHuffmanTrie
+from .schedule import AnswerSchedule
+
+# Lower case letters, most common first, for synthetic non-Latin dictionaries.
+# The Greek ones include the accented vowels and final sigma, 36 symbols.
+ALPHABETS = [
+  ('greek', 'αοιετσνηυρπκμλωγδθχφβξζψ' 'άέίόήύώϊϋΐΰς'),
+  ('cyrillic', 'оеаинтсрвлкмдпуяыьгзбчйхжшюцщэфъё'),
+]
+
+def best_of(func, repeat):
+  best = None
+  for i in range(repeat):
+    s = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - s
+    best = elapsed if best is None else min(best, elapsed)
+  return best
+
+def import_time(statement, repeat):
+  def run():
+    subprocess.run([sys.executable, '-c', statement], check=True)
+  return best_of(run, repeat)
+
+def bench_imports(repeat):
+  print("# Import Time (best of {})".format(repeat))
+  baseline = import_time('pass', repeat)
+  for name, statement in [
+      ('bitstring', 'import bitstring'),
+      ('wordle_trie.bit_reader', 'import wordle_trie.bit_reader'),
+      ('wordle_trie.encoder', 'import wordle_trie.encoder')]:
+    elapsed = import_time(statement, repeat) - baseline
+    print("{:<20} {:8.2f}ms".format(name, elapsed * 1000))
+  print("")
+
+def bench_decode(filename, repeat):
+  with open(filename, 'rb') as fp:
+    data = fp.read()
+  symbols = list(ALPHABET)
+
+  def decode(source):
+    return lambda: WordleHuffmanTrie().decode(source(), symbols)
+
+  inputs = [
+    ('bytes', lambda: data),
+    ('memoryview', lambda: memoryview(data)),
+    ('path', lambda: filename),
+  ]
+  try:
+    from bitstring import BitArray
+    inputs.append(('BitArray', lambda: BitArray(bytes=data)))
+  except ImportError:
+    pass
+
+  num_words = len(WordleHuffmanTrie().decode(data, symbols))
+  print("# Decode {} ({:,} bytes, {:,} words, best of {})".format(
+    os.path.basename(filename), len(data), num_words, repeat))
+  for name, source in inputs:
+    elapsed = best_of(decode(source), repeat)
+    print("{:<20} {:8.2f}ms {:8.0f}ns/word".format(
+      name, elapsed * 1000, elapsed / num_words * 1e9))
+  print("")
+
+def bench_layouts(filename, repeat, num_lookups=1000):
+  # Size, decode time and lookup latency of a fixed length dictionary in each
+  # layout, looking up a spread of words and as many that are missing.
+  words = WordleHuffmanTrie().decode(filename)
+  if len(set(map(len, words))) != 1:
+    return
+  symbols = sorted(set(''.join(words)))
+  step = max(1, len(words) // num_lookups)
+  lookups = words[::step] + [x[:-1] + 'q' for x in words[::step]]
+  layouts = []
+  for name, layout, container in [
+      ('huffman', 'huffman', False),
+      ('huffman+index', 'huffman', True),
+      ('bytes', 'bytes', True),
+      ('louds', 'louds', True)]:
+    trie = WordleHuffmanTrie()
+    trie.encode(words, symbols, layout=layout)
+    layouts.append((name, trie.tocontainer() if container else trie.tobytes()))
+
+  print("# Layouts {} ({:,} words, {:,} lookups, best of {})".format(
+    os.path.basename(filename), len(words), len(lookups), repeat))
+  print("{:<16} {:>10} {:>10} {:>12}".format(
+    "Layout", "Bytes", "Decode", "Lookup"))
+  for name, data in layouts:
+    decode = best_of(lambda: WordleHuffmanTrie().decode(data), repeat)
+    trie = WordleHuffmanTrie()
+    trie.decode(data)
+    lookup = best_of(lambda: [trie.index_of(x) for x in lookups], repeat)
+    print("{:<16} {:>10,} {:>8.2f}ms {:>10.2f}us".format(name, len(data),
+      decode * 1000, lookup / len(lookups) * 1e6))
+  print("")
+
+def synthetic_words(letters, count, length=5, seed=0):
+  # Words with letter frequencies falling off as in natural text, decomposed
+  # half the time so normalization has something to do.
+  import unicodedata
+
+  rng = random.Random(seed)
+  weights = [1 / (i + 1) for i in range(len(letters))]
+  words = set()
+  while len(words) < count:
+    word = ''.join(rng.choices(letters, weights, k=length))
+    if rng.random() < 0.5:
+      word = unicodedata.normalize('NFD', word)
+    words.add(word)
+  return sorted(words)
+
+def bench_alphabets(repeat, count=10000, num_lookups=1000):
+  # Encodes synthetic dictionaries in non-Latin alphabets, discovering the
+  # alphabet from the words, and checks they round trip.
+  print("# Alphabets ({:,} words, {:,} lookups, best of {})".format(
+    count, num_lookups, repeat))
+  print("{:<10} {:>8} {:>10} {:>10} {:>12}  {}".format(
+    "Alphabet", "Symbols", "Bytes", "Decode", "Lookup", "Result"))
+  failures = 0
+  for name, letters in ALPHABETS:
+    words = sorted(set(normalize_words(synthetic_words(letters, count))))
+    symbols = discover_alphabet(words)
+    trie = WordleHuffmanTrie()
+    trie.encode(words, symbols)
+    data = trie.tocontainer()
+    decode = best_of(lambda: WordleHuffmanTrie().decode(data), repeat)
+    trie = WordleHuffmanTrie()
+    decoded = trie.decode(data)
+    lookups = words[::max(1, len(words) // num_lookups)]
+    lookup = best_of(lambda: [trie.index_of(x) for x in lookups], repeat)
+    result = "ok"
+    if decoded != words:
+      result = "decoded words differ"
+      failures += 1
+    print("{:<10} {:>8} {:>10,} {:>8.2f}ms {:>10.2f}us  {}".format(name,
+      len(symbols), len(data), decode * 1000, lookup / len(lookups) * 1e6,
+      result))
+  print("")
+  return failures
+
+def check_schedule(filename, repeat, num_answers=2315, day_offset=19000):
+  # Round trips a schedule of num_answers distinct words of the dictionary,
+  # standing in for the answers left out of this repository, on its own and
+  # in a container. Returns the number of failures.
+  trie = WordleHuffmanTrie()
+  words = trie.decode(filename)
+  indices = random.Random(0).sample(range(1, len(words) + 1),
+    min(num_answers, len(words)))
+  data = AnswerSchedule.build(indices, day_offset, len(words)).tobytes()
+  schedule = AnswerSchedule(memoryview(data))
+  days = range(day_offset, day_offset + len(indices))
+  elapsed = best_of(lambda: [schedule.answer_for_day(x) for x in days], repeat)
+  print("# Answer Schedule {} ({:,} days, best of {})".format(
+    os.path.basename(filename), len(indices), repeat))
+  print("{:<20} {:>8,} bytes, {} bits/day (answers.bin: {:,} bytes)".format(
+    "size", len(data), schedule.width, 3 + 2 * len(indices)))
+  print("{:<20} {:8.2f}us".format("answer_for_day",
+    elapsed / len(indices) * 1e6))
+  failures = []
+  if schedule.indices() != indices:
+    failures.append("schedule indices differ")
+  if any(schedule.answer_for_day(x) is not None
+      for x in (day_offset - 1, day_offset + len(indices))):
+    failures.append("unscheduled day has an answer")
+  trie.encode(words, list(ALPHABET))
+  loaded = WordleHuffmanTrie()
+  loaded.decode(trie.tocontainer(schedule=data))
+  sample = days[::max(1, len(indices) // 50)]
+  if [loaded.answer_for_day(x) for x in sample] != [
+      words[indices[x - day_offset] - 1] for x in sample]:
+    failures.append("answer_for_day differs in a container")
+  for failure in failures:
+    print("FAILED:", failure, file=sys.stderr)
+  print("")
+  return len(failures)
+
+def check_variable(filename, repeat, lengths=range(2, 12)):
+  # Checks a variable length dictionary against the fixed length files next to
+  # it (e.g. hellowordl.bin and hellowordl_2.bin to hellowordl_11.bin), and
+  # that lookups agree with the decoded order. Returns the number of failures.
+  with open(filename, 'rb') as fp:
+    data = fp.read()
+  trie = WordleHuffmanTrie(variable_length=True)
+  words = trie.decode(data)
+  elapsed = best_of(
+    lambda: WordleHuffmanTrie(variable_length=True).decode(data), repeat)
+  print("# Variable Length {} ({:,} bytes, {:,} words, best of {})".format(
+    os.path.basename(filename), len(data), len(words), repeat))
+  print("{:<20} {:8.2f}ms {:8.0f}ns/word".format(
+    "decode", elapsed * 1000, elapsed / len(words) * 1e9))
+
+  failures = []
+  streamed = WordleHuffmanTrie(variable_length=True)
+  streamed.load(data)
+  if list(streamed.iter_words()) != words:
+    failures.append("iter_words differs from decode")
+
+  indices = dict(zip(words, range(1, len(words) + 1)))
+  base = os.path.splitext(filename)[0]
+  fixed_size = 0
+  # Fresh tries walk the roots, decoded ones have recorded their offsets.
+  lookups = [('scan', streamed), ('offsets', trie)]
+  print("{:<8} {:>8} {:>10}  {}".format("Length", "Words", "File", "Result"))
+  samples = []
+  for length in lengths:
+    expected = [x for x in words if len(x) == length]
+    result = "ok"
+    fixed = '{}_{}.bin'.format(base, length)
+    if os.path.exists(fixed):
+      fixed_size += os.path.getsize(fixed)
+      if set(WordleHuffmanTrie().decode(fixed)) != set(expected):
+        result = "differs from " + os.path.basename(fixed)
+    sample = expected[::max(1, len(expected) // 3)][:3]
+    missing = [x for word in sample for x in (word[:-1], word + 'q')
+      if x not in indices]
+    for name, lookup in lookups:
+      if any(lookup.index_of(x) != indices[x] for x in sample):
+        result = "index_of ({}) disagrees with decode".format(name)
+      if any(lookup.contains(x) for x in missing):
+        result = "contains ({}) found a missing word".format(name)
+    samples += sample + missing
+    if result != "ok":
+      failures.append("length {}: {}".format(length, result))
+    print("{:<8} {:>8,} {:>10,}  {}".format(length, len(expected),
+      os.path.getsize(fixed) if os.path.exists(fixed) else 0, result))
+  for name, lookup in lookups:
+    if dict(lookup.word_indices(samples)) != {
+        x: indices[x] for x in samples if x in indices}:
+      failures.append("word_indices ({}) disagrees with decode".format(name))
+  if fixed_size:
+    print("One file (every length): {:,} bytes, per length files: {:,} "
+      "bytes".format(len(data), fixed_size))
+  for failure in failures:
+    print("FAILED:", failure, file=sys.stderr)
+  print("")
+  return len(failures)
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog='python -m wordle_trie.benchmark')
+  # The dictionaries are not installed with the package, pass a checkout's
+  # wordle_trie/words.bin and wordle_trie/hellowordl.bin.
+  parser.add_argument('dictionary')
+  parser.add_argument('-n', '--repeat', type=int, default=5)
+  parser.add_argument('--variable', metavar='DICTIONARY',
+    help="Also check a variable length dictionary against its per length "
+      "files, e.g. hellowordl.bin and hellowordl_2.bin to hellowordl_11.bin.")
+  args = parser.parse_args(argv)
+  bench_imports(args.repeat)
+  bench_decode(args.dictionary, args.repeat)
+  bench_layouts(args.dictionary, args.repeat)
+  failures = bench_alphabets(args.repeat)
+  failures += check_schedule(args.dictionary, args.repeat)
+  if args.variable:
+    failures += check_variable(args.variable, args.repeat)
+  return 1 if failures else 0
+
+if __name__ == "__main__":
+  sys.exit(main())
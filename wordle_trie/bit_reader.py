@@ -0,0 +1,154 @@
+import mmap
+import os
+
+def to_bin(data):
+  data = memoryview(data)
+  if not data.nbytes:
+    return ''
+  return format(int.from_bytes(data, 'big'), '0{}b'.format(data.nbytes * 8))
+
+def from_bin(string):
+  # Pads with zeros to a whole number of bytes, like BitArray.tobytes().
+  num_bytes = (len(string) + 7) // 8
+  if not num_bytes:
+    return b''
+  return int(string.ljust(num_bytes * 8, '0'), 2).to_bytes(num_bytes, 'big')
+
+# Codes up to this many bits are read with one slice and a dict lookup.
+PREFIX_BITS = 8
+
+def prefix_table(table):
+  # Maps each string of the next (up to) PREFIX_BITS bits to the symbol and
+  # length of the code it starts with, or to None where the code is longer.
+  width = min(PREFIX_BITS, max([len(code) for code in table] + [0]))
+  lookup = {}
+  for code, symbol in table.items():
+    if len(code) > width:
+      lookup[code[:width]] = None
+      continue
+    pad = width - len(code)
+    for i in range(1 << pad):
+      suffix = format(i, '0{}b'.format(pad)) if pad else ''
+      lookup[code + suffix] = (symbol, len(code))
+  return width, lookup, table
+
+class BitReader:
+  # Reads from plain bytes, a memoryview or a file path using only the standard
+  # library. A bitstring.BitArray is also accepted, which is required to write.
+  def __init__(self, bit_array, char_map=None):
+    if isinstance(bit_array, (str, os.PathLike)):
+      with open(bit_array, 'rb') as fp:
+        bit_array = fp.read()
+    self.bits = bit_array
+    self.bin = bit_array.bin if hasattr(bit_array, 'bin') else to_bin(bit_array)
+    self.i = 0
+    self.char_map = char_map
+
+  def write(self, key, num_bits):
+    bits = []
+    val = self.char_map[key] if isinstance(key, str) else key
+    mask = 0b1 << num_bits - 1
+    for i in range(1, num_bits + 1):
+      bits.append((val & mask) >> num_bits - i)
+      mask >>= 1
+    self.bits.append(bits)
+
+  def append(self, data):
+    self.bits.append(data)
+
+  def read(self, num_bits):
+    bits = self.bin[self.i:self.i+num_bits]
+    self.i += num_bits
+    return bits
+
+  def read_bit(self):
+    self.i += 1
+    return self.bin[self.i - 1] == '1'
+
+  def read_int(self, num_bits):
+    return int(self.read(num_bits), 2)
+
+  def read_varint(self, table):
+    start = self.i
+    for end in range(start + 1, len(self.bin) + 1):
+      code = self.bin[start:end]
+      if code in table:
+        self.i = end
+        return table[code]
+    raise ValueError("No Huffman code at bit {}.".format(start))
+
+  # Reads a code using a prefix_table, falling back to read_varint for long
+  # codes and at the end of the data.
+  def read_code(self, prefix):
+    width, lookup, table = prefix
+    entry = lookup.get(self.bin[self.i:self.i + width])
+    if entry is None:
+      return self.read_varint(table)
+    self.i += entry[1]
+    return entry[0]
+
+  def tobytes(self):
+    return self.bits.tobytes() if hasattr(self.bits, 'tobytes') else bytes(self.bits)
+
+  def __len__(self):
+    if hasattr(self.bits, 'bin'):
+      return len(self.bits)
+    return len(self.bin)
+
+class MappedBitReader(BitReader):
+  # Reads in place from bytes, a memoryview (e.g. of a memory mapped
+  # container's payload) or a file it maps, rather than from a string of
+  # every bit, which takes a byte per bit of heap. Reads are a few times
+  # slower, see WordleHuffmanTrie.load's budget.
+  def __init__(self, data):
+    if isinstance(data, (str, os.PathLike)):
+      with open(data, 'rb') as fp:
+        data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    elif hasattr(data, 'bin'):
+      data = data.tobytes()
+    self.bits = data
+    self.data = memoryview(data)
+    self.size = self.data.nbytes * 8
+    self.i = 0
+    self.char_map = None
+
+  # Bits [start, end) as a string, as slicing BitReader.bin gives.
+  def _slice(self, start, end):
+    end = min(end, self.size)
+    if end <= start:
+      return ''
+    lo, hi = start // 8, (end + 7) // 8
+    value = int.from_bytes(self.data[lo:hi], 'big') >> hi * 8 - end
+    return format(value & (1 << end - start) - 1, '0{}b'.format(end - start))
+
+  def read(self, num_bits):
+    bits = self._slice(self.i, self.i + num_bits)
+    self.i += num_bits
+    return bits
+
+  def read_bit(self):
+    self.i += 1
+    return self.data[(self.i - 1) // 8] >> 7 - (self.i - 1) % 8 & 1 == 1
+
+  def read_varint(self, table):
+    start = self.i
+    for end in range(start + 1, self.size + 1):
+      code = self._slice(start, end)
+      if code in table:
+        self.i = end
+        return table[code]
+    raise ValueError("No Huffman code at bit {}.".format(start))
+
+  def read_code(self, prefix):
+    width, lookup, table = prefix
+    entry = lookup.get(self._slice(self.i, self.i + width))
+    if entry is None:
+      return self.read_varint(table)
+    self.i += entry[1]
+    return entry[0]
+
+  def tobytes(self):
+    return bytes(self.data)
+
+  def __len__(self):
+    return self.size
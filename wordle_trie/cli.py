@@ -0,0 +1,473 @@
+import argparse
+import itertools
+import json
+import sys
+import time
+
+# Only the standard library is imported at module level, each command pulls in
+# what it needs so that `wordle-lookup` starts as quickly as possible.
+
+def _read_words(filenames, length=None):
+  from .alphabet import normalize_words
+
+  words = []
+  for filename in filenames:
+    with open(filename, 'r') as fp:
+      words += normalize_words(json.load(fp))
+  if length is not None:
+    words = [x for x in words if len(x) == length]
+  return words
+
+def _alphabet(args, words):
+  from .alphabet import discover_alphabet
+  from .encoder import ALPHABET
+
+  # a-z unless the words need more letters, when it is the words' own
+  # alphabet, which only a container stores.
+  if args.alphabet:
+    return args.alphabet
+  symbols = discover_alphabet(words)
+  return ALPHABET if set(symbols).issubset(ALPHABET) else symbols
+
+def _symbols(args):
+  return list(args.alphabet) if args.alphabet else None
+
+def _load(args):
+  from .encoder import WordleHuffmanTrie
+
+  trie = WordleHuffmanTrie(variable_length=args.variable_length)
+  trie.load(args.input, _symbols(args), args.tables, args.budget)
+  return trie
+
+def _add_budget(parser):
+  parser.add_argument('--budget', type=int, metavar='BYTES',
+    help="Read the payload in place, rather than as a string of its bits, "
+      "if that would take the dictionary past this much memory.")
+
+def encode(args):
+  from .encoder import ALPHABET, WordleHuffmanTrie, encode_answers
+  from .schedule import AnswerSchedule
+
+  if args.stream:
+    return encode_stream(args)
+  words = _read_words(args.words, args.length)
+  answers = _read_words([args.answers]) if args.answers else []
+  words += answers
+  if not words:
+    print("No words to encode.", file=sys.stderr)
+    return 1
+
+  alphabet = _alphabet(args, words)
+  symbols = dict(zip(alphabet, range(len(alphabet))))
+  # Chunks, filters, perfect hashes and level order layouts are container
+  # sections.
+  as_container = (args.container or args.chunks or args.filter or args.mph or
+    args.skips or args.layout != 'huffman' or alphabet != (
+      args.alphabet or ALPHABET))
+  answers_output = args.answers_output or 'answers.bin'
+  if answers and args.schedule and not as_container and (
+      args.answers_output is None):
+    # Not the answers.bin the clone reads, so it is not written there.
+    print("--schedule needs --container or --answers-output.", file=sys.stderr)
+    return 1
+  if args.tables:
+    if answers:
+      print("Answers cannot be encoded with shared tables.", file=sys.stderr)
+      return 1
+    return encode_shared(args, words, symbols)
+  trie = WordleHuffmanTrie(variable_length=args.variable_length)
+  try:
+    trie.encode(words, symbols, layout=args.layout, workers=args.workers)
+  except ValueError as e:
+    print(e, file=sys.stderr)
+    return 1
+  if args.verify or answers:
+    s = time.monotonic()
+    trie2 = WordleHuffmanTrie(variable_length=args.variable_length)
+    decoded = trie2.decode(trie.tocontainer() if args.layout != 'huffman' else
+      trie.tobytes(), list(alphabet))
+    if args.verify:
+      print("# Verification")
+      print("Num Words Decoded:", len(decoded))
+      print("First Word:", decoded[0])
+      print("Last Word:", decoded[-1])
+      print("Decode Time: {:0.3f}s".format(time.monotonic() - s))
+      if sorted(set(words)) != sorted(decoded):
+        print("Decoded words do not match the input.", file=sys.stderr)
+        return 1
+
+  answer_bytes = schedule_bytes = None
+  if answers:
+    if args.schedule:
+      answer_set = answers[args.day_offset:]
+    else:
+      answer_set = answers[args.day_offset:args.day_offset+args.day_count]
+    answer_idxs = dict(trie2.word_indices(answer_set))
+    idxs = [answer_idxs[answer] for answer in answer_set]
+    if args.schedule:
+      schedule_bytes = AnswerSchedule.build(idxs, args.day_offset,
+        len(decoded)).tobytes()
+    else:
+      answer_bytes = encode_answers(idxs, args.day_offset, len(decoded))
+
+  if as_container:
+    data = trie.tocontainer(answers=answer_bytes, chunks=args.chunks,
+      filter_rate=args.filter, mph=args.mph, skips=args.skips,
+      schedule=schedule_bytes)
+  else:
+    data = trie.tobytes()
+  if args.verbose:
+    if as_container:
+      # The filter, perfect hash and sections are only built into the file.
+      trie = WordleHuffmanTrie()
+      trie.load(data)
+    trie.print_debug()
+  with open(args.output, 'wb') as fp:
+    fp.write(data)
+  if answers and not as_container:
+    with open(answers_output, 'wb') as fp:
+      fp.write(answer_bytes if schedule_bytes is None else schedule_bytes)
+  return 0
+
+def encode_stream(args):
+  from .alphabet import normalize_lines
+  from .encoder import ALPHABET, WordleHuffmanTrie
+
+  if (len(args.words) != 1 or args.length or args.answers or args.tables or
+      args.filter is not None or args.mph or args.layout != 'huffman'):
+    print("--stream takes one file and no length, answers, tables, filter, "
+      "perfect hash or layout.", file=sys.stderr)
+    return 1
+  with open(args.words[0], 'r') as fp:
+    alphabet = _alphabet(args, normalize_lines(fp))
+  trie = WordleHuffmanTrie(variable_length=args.variable_length)
+  try:
+    trie.encode_stream(args.words[0], alphabet)
+  except ValueError as e:
+    print(e, file=sys.stderr)
+    return 1
+  if args.verbose:
+    trie.print_debug()
+  if args.verify:
+    decoded = WordleHuffmanTrie(variable_length=args.variable_length).decode(
+      trie.tobytes(), list(alphabet))
+    with open(args.words[0], 'r') as fp:
+      words = sorted(set(normalize_lines(fp)))
+    if words != decoded:
+      print("Decoded words do not match the input.", file=sys.stderr)
+      return 1
+  with open(args.output, 'wb') as fp:
+    if args.container or args.chunks or args.skips or alphabet != (
+        args.alphabet or ALPHABET):
+      fp.write(trie.tocontainer(chunks=args.chunks, skips=args.skips))
+    else:
+      fp.write(trie.tobytes())
+  return 0
+
+def encode_shared(args, words, symbols):
+  import os
+  from .encoder import WordleHuffmanTrie
+
+  # A dictionary per word length, all using the tables in args.tables, which
+  # are trained on these words if the file does not exist yet.
+  lengths = sorted(set(map(len, words)))
+  if len(lengths) > 1 and '{length}' not in args.output:
+    print("Output needs a {length} placeholder for more than one length.",
+      file=sys.stderr)
+    return 1
+  if not os.path.exists(args.tables):
+    tables = WordleHuffmanTrie()
+    tables.encode_tables(words, symbols)
+    with open(args.tables, 'wb') as fp:
+      fp.write(tables.totables())
+  shared = WordleHuffmanTrie()
+  shared.load_tables(args.tables)
+
+  for length in lengths:
+    group = [x for x in words if len(x) == length]
+    trie = WordleHuffmanTrie()
+    try:
+      trie.encode(group, None, shared=shared, workers=args.workers)
+    except ValueError as e:
+      print(e, file=sys.stderr)
+      return 1
+    if args.verbose:
+      trie.print_debug()
+    data = trie.tocontainer(index=args.container, chunks=args.chunks,
+      filter_rate=args.filter, mph=args.mph, skips=args.skips)
+    if args.verify:
+      decoded = WordleHuffmanTrie().decode(data, tables=shared)
+      if sorted(set(group)) != sorted(decoded):
+        print("Decoded {} letter words do not match the input.".format(length),
+          file=sys.stderr)
+        return 1
+    with open(args.output.format(length=length), 'wb') as fp:
+      fp.write(data)
+  return 0
+
+def decode(args):
+  from .encoder import WordleHuffmanTrie
+
+  s = time.monotonic()
+  trie = WordleHuffmanTrie(variable_length=args.variable_length)
+  words = trie.decode(args.input, _symbols(args), args.tables)
+  if args.verbose:
+    trie.print_debug()
+    print("Decode Time: {:0.3f}s".format(time.monotonic() - s), file=sys.stderr)
+    for name, size in trie.memory_report(words).items():
+      if size:
+        print("Memory {} (Bytes): {}".format(name, size), file=sys.stderr)
+
+  if args.output:
+    with open(args.output, 'w') as fp:
+      json.dump(words, fp)
+  else:
+    json.dump(words, sys.stdout)
+    print("")
+  return 0
+
+def lookup(args):
+  import unicodedata
+
+  trie = _load(args)
+  words = args.words
+  if words == ['-']:
+    # One word per line, streamed so logs of any size can be checked.
+    words = (line.strip() for line in sys.stdin)
+  # As encode normalizes the words.
+  words = (unicodedata.normalize('NFC', x) for x in words)
+  words, queries = itertools.tee(words)
+  missing = 0
+  for word, index in zip(words, trie.index_of_many(queries)):
+    if index is None:
+      missing += 1
+    print(word, '-' if index is None else index)
+  return 1 if missing else 0
+
+def query(args):
+  import unicodedata
+
+  trie = _load(args)
+  prefix, include, exclude = [unicodedata.normalize('NFC', x)
+    for x in (args.prefix, args.include, args.exclude)]
+  for word in trie.query(prefix=prefix, pattern=args.pattern,
+      include=include, exclude=exclude):
+    print(word)
+  return 0
+
+def update(args):
+  from .update import update as update_dictionary
+
+  with open(args.input, 'rb') as fp:
+    old = fp.read()
+  add = _read_words(args.add) if args.add else []
+  remove = _read_words(args.remove) if args.remove else []
+  new, patch = update_dictionary(old, add=add, remove=remove,
+    max_growth=args.max_growth, variable_length=args.variable_length)
+  with open(args.output, 'wb') as fp:
+    fp.write(new)
+  if args.patch:
+    with open(args.patch, 'wb') as fp:
+      fp.write(patch)
+  print("Dictionary (Bytes): {} -> {}".format(len(old), len(new)))
+  print("Patch (Bytes):", len(patch))
+  return 0
+
+def patch(args):
+  from .update import apply_patch
+
+  with open(args.input, 'rb') as fp:
+    old = fp.read()
+  with open(args.patch, 'rb') as fp:
+    new = apply_patch(old, fp.read())
+  with open(args.output or args.input, 'wb') as fp:
+    fp.write(new)
+  return 0
+
+def _chunks(value):
+  if value == 'letter':
+    return value
+  try:
+    size = int(value)
+  except ValueError:
+    size = 0
+  if size < 1:
+    raise argparse.ArgumentTypeError(
+      "expected 'letter' or a size in bytes, got {!r}".format(value))
+  return size
+
+def _rate(value):
+  try:
+    rate = float(value)
+  except ValueError:
+    rate = 0
+  if not 0 < rate < 1:
+    raise argparse.ArgumentTypeError(
+      "expected a rate between 0 and 1, got {!r}".format(value))
+  return rate
+
+def _add_common(parser):
+  parser.add_argument('--alphabet',
+    help="Symbols in the order used at encode time (default a-z, or the "
+      "alphabet stored in a container).")
+  parser.add_argument('--variable-length', action='store_true',
+    help="Dictionary contains words of differing lengths.")
+  parser.add_argument('--tables',
+    help="Shared tables file. encode writes a payload only dictionary per "
+      "word length using it, training it on the words first if it does not "
+      "exist, and decode and lookup read those (default the built in tables).")
+
+def _encode_parser(parser):
+  parser.add_argument('words', nargs='+', help="JSON word lists to encode.")
+  parser.add_argument('-o', '--output', default='words.bin')
+  parser.add_argument('--length', type=int,
+    help="Only encode words of this length.")
+  parser.add_argument('--answers', help="JSON list of answers, in day order.")
+  parser.add_argument('--answers-output',
+    help="Where to write answers, unless they go in the container. Defaults "
+      "to answers.bin, but must be given for a raw --schedule.")
+  parser.add_argument('--container', action='store_true',
+    help="Write a checksummed container with symbols, tables, payload, a "
+      "root index and answers, rather than a raw words.bin.")
+  parser.add_argument('--chunks', type=_chunks,
+    help="Write a container whose payload is split into independently "
+      "decodable chunks, 'letter' for one per first letter or a size in bytes "
+      "to group them up to.")
+  parser.add_argument('--filter', type=_rate, nargs='?', const=0.01,
+    metavar='RATE',
+    help="Write a container with a Bloom filter in front of lookups, sized "
+      "for this false positive rate (default 0.01, about 10 bits per word).")
+  parser.add_argument('--mph', action='store_true',
+    help="Write a container with a minimal perfect hash from words to their "
+      "index, for O(1) ranks.")
+  parser.add_argument('--skips', action='store_true',
+    help="Write a container with the sizes of the root subtrees and their "
+      "children, so queries skip the ones they rule out.")
+  parser.add_argument('--layout', choices=['huffman', 'bytes', 'louds'],
+    default='huffman',
+    help="'bytes' writes a container with a byte aligned, level order trie, "
+      "bigger than the Huffman coded one but quicker to decode and look words "
+      "up in. 'louds' writes a level order trie with Huffman coded labels, "
+      "close to the Huffman coded size with random access to any word. Fixed "
+      "length dictionaries only.")
+  parser.add_argument('--stream', action='store_true',
+    help="Read WORDS as one sorted file of one word per line and encode it in "
+      "two passes, without holding the words or their trie in memory.")
+  parser.add_argument('--schedule', action='store_true',
+    help="Encode every answer from --day-offset as an answer schedule with "
+      "exact width indices (a SCHD section in a container), rather than "
+      "--day-count days of 16 bit ones.")
+  parser.add_argument('--workers', type=int,
+    help="Encode root subtrees in this many processes, to the same output.")
+  parser.add_argument('--day-offset', type=int, default=0)
+  parser.add_argument('--day-count', type=int, default=30)
+  parser.add_argument('--verify', action='store_true',
+    help="Decode the output and check it against the input.")
+  parser.add_argument('-v', '--verbose', action='store_true')
+  _add_common(parser)
+  parser.set_defaults(func=encode)
+
+def _decode_parser(parser):
+  parser.add_argument('input', help="Encoded dictionary.")
+  parser.add_argument('-o', '--output', help="Write JSON here, not stdout.")
+  parser.add_argument('-v', '--verbose', action='store_true')
+  _add_common(parser)
+  parser.set_defaults(func=decode)
+
+def _lookup_parser(parser):
+  parser.add_argument('input', help="Encoded dictionary.")
+  parser.add_argument('words', nargs='+')
+  _add_budget(parser)
+  _add_common(parser)
+  parser.set_defaults(func=lookup)
+
+def _pattern(value):
+  import unicodedata
+
+  # '?' and '.' match any letter, [abc] any of a, b and c.
+  value = unicodedata.normalize('NFC', value)
+  pattern = []
+  i = 0
+  while i < len(value):
+    if value[i] == '[':
+      end = value.find(']', i)
+      if end < 0:
+        raise argparse.ArgumentTypeError("unclosed [ in {!r}".format(value))
+      pattern.append(value[i + 1:end])
+      i = end + 1
+    else:
+      pattern.append(value[i])
+      i += 1
+  return pattern
+
+def _query_parser(parser):
+  parser.add_argument('input', help="Encoded dictionary.")
+  parser.add_argument('--prefix', default='')
+  parser.add_argument('--pattern', type=_pattern,
+    help="Letters at each position, '?' for any or [abc] for one of a set, "
+      "e.g. 'cr?n?'. Words must be the pattern's length.")
+  parser.add_argument('--include', default='',
+    help="Letters words must contain.")
+  parser.add_argument('--exclude', default='',
+    help="Letters words must not contain.")
+  _add_budget(parser)
+  _add_common(parser)
+  parser.set_defaults(func=query)
+
+def _update_parser(parser):
+  parser.add_argument('input', help="Encoded dictionary.")
+  parser.add_argument('-o', '--output', required=True)
+  parser.add_argument('--add', nargs='+', help="JSON word lists to add.")
+  parser.add_argument('--remove', nargs='+',
+    help="JSON word lists to remove.")
+  parser.add_argument('--patch', help="Write a patch from input to output.")
+  parser.add_argument('--max-growth', type=float, default=0.01,
+    help="Reuse the Huffman tables unless the result is more than this "
+      "fraction bigger than rebuilding them.")
+  parser.add_argument('--variable-length', action='store_true',
+    help="Raw dictionary contains words of differing lengths.")
+  parser.set_defaults(func=update)
+
+def _patch_parser(parser):
+  parser.add_argument('input', help="Encoded dictionary.")
+  parser.add_argument('patch')
+  parser.add_argument('-o', '--output', help="Defaults to the input.")
+  parser.set_defaults(func=patch)
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog='python -m wordle_trie')
+  commands = parser.add_subparsers(dest='command', required=True)
+  _encode_parser(commands.add_parser('encode', help="Encode a dictionary."))
+  _decode_parser(commands.add_parser('decode', help="Decode a dictionary."))
+  _lookup_parser(commands.add_parser('lookup', help="Look up words."))
+  _query_parser(commands.add_parser('query',
+    help="List words by prefix and letters."))
+  _update_parser(commands.add_parser('update',
+    help="Add and remove words, writing a patch."))
+  _patch_parser(commands.add_parser('patch', help="Apply a patch."))
+  args = parser.parse_args(argv)
+  return args.func(args)
+
+def _run(build, prog, argv=None):
+  parser = argparse.ArgumentParser(prog=prog)
+  build(parser)
+  args = parser.parse_args(argv)
+  return args.func(args)
+
+def encode_main(argv=None):
+  return _run(_encode_parser, 'wordle-encode', argv)
+
+def decode_main(argv=None):
+  return _run(_decode_parser, 'wordle-decode', argv)
+
+def lookup_main(argv=None):
+  return _run(_lookup_parser, 'wordle-lookup', argv)
+
+def query_main(argv=None):
+  return _run(_query_parser, 'wordle-query', argv)
+
+def update_main(argv=None):
+  return _run(_update_parser, 'wordle-update', argv)
+
+def patch_main(argv=None):
+  return _run(_patch_parser, 'wordle-patch', argv)
@@ -0,0 +1,158 @@
+import mmap
+import os
+import struct
+import zlib
+
+# Container layout, all integers big-endian:
+#
+#   magic    4s  b'WTRI'
+#   version  B   FORMAT_VERSION
+#   flags    B   FLAG_* bits
+#   count    H   number of sections
+#   length   I   total file length in bytes
+#   crc      I   CRC32 of the section table
+#   table    count * (tag 4s, offset I, length I, crc32 I)
+#   sections each starting at its offset, in table order
+#
+# Sections are byte aligned, so each can be sliced (or mmap'd) on its own and
+# is checked against its own CRC32 before it is decoded. Chunked containers
+# put the payload last, so everything else can be fetched (with a Range
+# request) and opened as a partial container before the payload arrives.
+MAGIC = b'WTRI'
+FORMAT_VERSION = 1
+
+FLAG_VARIABLE_LENGTH = 0b1
+
+SYMBOLS = b'SYMB'
+TABLES = b'HUFF'
+PAYLOAD = b'PAYL'
+INDEX = b'INDX'
+ANSWERS = b'ANSW'
+CHUNKS = b'CHNK'
+FILTER = b'BLOM'
+PERFECT_HASH = b'MPHF'
+TABLE_REF = b'TREF'
+LEVELS = b'LVLS'
+LOUDS = b'LOUD'
+SKIPS = b'SKIP'
+SCHEDULE = b'SCHD'
+
+HEADER = struct.Struct('>4sBBHII')
+ENTRY = struct.Struct('>4sIII')
+
+class ContainerError(ValueError):
+  pass
+
+def write_container(sections, flags=0):
+  offset = HEADER.size + ENTRY.size * len(sections)
+  table = b''
+  for tag, data in sections:
+    table += ENTRY.pack(tag, offset, len(data), zlib.crc32(data))
+    offset += len(data)
+  header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(sections), offset,
+    zlib.crc32(table))
+  return b''.join([header, table] + [bytes(data) for tag, data in sections])
+
+def open_container(source, verify=True, partial=False):
+  # Returns None when the source is not a container, e.g. a raw words.bin.
+  if isinstance(source, (str, os.PathLike)):
+    with open(source, 'rb') as fp:
+      if fp.read(len(MAGIC)) != MAGIC:
+        return None
+    return Container.open(source, verify=verify, partial=partial)
+  if hasattr(source, 'bin'):
+    # bitstring.BitArray.
+    if len(source) < 32 or source[:32].tobytes() != MAGIC:
+      return None
+    source = source.tobytes()
+  data = memoryview(source)
+  if bytes(data[:len(MAGIC)]) != MAGIC:
+    return None
+  return Container(data, verify=verify, partial=partial)
+
+class Container:
+  # A partial container is only the start of one, sections past the end of the
+  # data raise ContainerError when they are used.
+  def __init__(self, data, verify=True, partial=False):
+    self.data = memoryview(data)
+    self._mmap = None
+    if len(self.data) < HEADER.size:
+      raise ContainerError("Truncated container header.")
+    (magic, self.version, self.flags, count, length,
+      crc) = HEADER.unpack_from(self.data)
+    if magic != MAGIC:
+      raise ContainerError("Not a container, bad magic {!r}.".format(magic))
+    if self.version != FORMAT_VERSION:
+      raise ContainerError("Unsupported version {}.".format(self.version))
+    self.length = length
+    self.partial = partial
+    if length != len(self.data) and not (partial and length > len(self.data)):
+      raise ContainerError("Expected {} bytes, got {}.".format(
+        length, len(self.data)))
+    table = self.data[HEADER.size:HEADER.size + ENTRY.size * count]
+    if len(table) != ENTRY.size * count:
+      raise ContainerError("Truncated section table.")
+    if zlib.crc32(table) != crc:
+      raise ContainerError("Section table checksum mismatch.")
+
+    self.sections = {}
+    for tag, offset, length, crc in ENTRY.iter_unpack(table):
+      if offset + length > self.length:
+        raise ContainerError("Section {!r} out of bounds.".format(tag))
+      self.sections[tag] = (offset, length, crc)
+    self._verified = set()
+    if verify:
+      self.verify()
+
+  @classmethod
+  def open(cls, filename, verify=True, partial=False):
+    with open(filename, 'rb') as fp:
+      mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+      container = cls(mapped, verify=verify, partial=partial)
+    except Exception:
+      mapped.close()
+      raise
+    container._mmap = mapped
+    return container
+
+  def verify(self):
+    for tag in self.sections:
+      if self.available(tag):
+        self.section(tag)
+
+  def available(self, tag):
+    offset, length, crc = self.sections[tag]
+    return offset + length <= len(self.data)
+
+  def section(self, tag):
+    if tag not in self.sections:
+      raise ContainerError("Missing section {!r}.".format(tag))
+    if not self.available(tag):
+      raise ContainerError("Section {!r} is past the end of the data.".format(
+        tag))
+    offset, length, crc = self.sections[tag]
+    data = self.data[offset:offset + length]
+    if tag not in self._verified:
+      if zlib.crc32(data) != crc:
+        raise ContainerError("Section {!r} checksum mismatch.".format(tag))
+      self._verified.add(tag)
+    return data
+
+  def get(self, tag):
+    return self.section(tag) if tag in self else None
+
+  def close(self):
+    self.data.release()
+    if self._mmap is not None:
+      self._mmap.close()
+      self._mmap = None
+
+  def __contains__(self, tag):
+    return tag in self.sections
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
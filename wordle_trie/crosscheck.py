@@ -0,0 +1,125 @@
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from . import container
+from .benchmark import best_of
+from .encoder import ALPHABET, WordleHuffmanTrie
+
+# Decodes dictionaries with both encoder.py and the clone's JS decoder (under
+# node, if installed), checks they agree and compares their speed.
+#
+#   python -m wordle_trie.crosscheck [files...] [-n repeat] [--node path]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JS_SOURCES = os.path.join(ROOT, 'clone', 'static', 'src')
+
+# Prints a JSON object per file with the decoded words and the best time.
+RUNNER = r"""
+import { readFileSync } from 'fs';
+import { WordleDict } from './wordle_dict.js';
+
+const repeat = parseInt(process.argv[2]);
+for (const filename of process.argv.slice(3)) {
+  const data = readFileSync(filename);
+  const buf = data.buffer.slice(data.byteOffset, data.byteOffset + data.length);
+  let words = null;
+  let best = null;
+  for (let i = 0; i < repeat; ++i) {
+    const start = process.hrtime.bigint();
+    words = new WordleDict(buf).words();
+    const elapsed = Number(process.hrtime.bigint() - start);
+    best = best === null ? elapsed : Math.min(best, elapsed);
+  }
+  console.log(JSON.stringify({filename: filename, words: words, ns: best}));
+}
+"""
+
+def default_files():
+  files = glob.glob(os.path.join(ROOT, 'wordle_trie', '*.bin'))
+  files += glob.glob(os.path.join(ROOT, 'clone', 'static', '*.bin'))
+  return sorted(x for x in files if not os.path.basename(x).startswith('answers'))
+
+def variable_length(data):
+  # Only variable length dictionaries have leaves, and so a code for a child
+  # count of zero, in the last table.
+  trie = WordleHuffmanTrie()
+  trie.load(data, list(ALPHABET))
+  return 0 in trie.tables[-1].values()
+
+def run_js(node, files, repeat):
+  # The sources are ES modules, copied next to a package.json saying so.
+  with tempfile.TemporaryDirectory() as path:
+    for name in ('bit_reader.js', 'wordle_dict.js'):
+      shutil.copy(os.path.join(JS_SOURCES, name), path)
+    with open(os.path.join(path, 'package.json'), 'w') as fp:
+      json.dump({'type': 'module'}, fp)
+    with open(os.path.join(path, 'runner.js'), 'w') as fp:
+      fp.write(RUNNER)
+    out = subprocess.run([node, 'runner.js', str(repeat)] + files, cwd=path,
+      check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+  results = [json.loads(line) for line in out.splitlines() if line]
+  return {x['filename']: x for x in results}
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog='python -m wordle_trie.crosscheck')
+  parser.add_argument('files', nargs='*',
+    help="Dictionaries to check (default every wordle_trie/*.bin and "
+      "clone/static/*.bin).")
+  parser.add_argument('-n', '--repeat', type=int, default=5)
+  parser.add_argument('--node', default=shutil.which('node'),
+    help="JS runtime to use (default node on the PATH).")
+  args = parser.parse_args(argv)
+
+  files = [os.path.abspath(x) for x in args.files or default_files()]
+  checked = []
+  print("{:<32} {:>8} {:>12} {:>12}  {}".format(
+    "File", "Words", "Python ns/w", "JS ns/w", "Result"))
+  rows = []
+  for filename in files:
+    with open(filename, 'rb') as fp:
+      data = fp.read()
+    name = os.path.relpath(filename, ROOT)
+    if container.open_container(data) is not None:
+      rows.append((name, None, None, "skipped, the JS decoder reads raw files"))
+      continue
+    variable = variable_length(data)
+    words = WordleHuffmanTrie(variable_length=variable).decode(data)
+    elapsed = best_of(lambda: WordleHuffmanTrie(
+      variable_length=variable).decode(data), args.repeat)
+    if variable:
+      rows.append((name, words, elapsed,
+        "skipped, the JS decoder is fixed length only"))
+    else:
+      rows.append((name, words, elapsed, None))
+      checked.append(filename)
+
+  js = {}
+  if not args.node:
+    print("No JS runtime found, only decoding with Python.", file=sys.stderr)
+  elif checked:
+    js = run_js(args.node, checked, args.repeat)
+
+  failed = 0
+  for filename, (name, words, elapsed, result) in zip(files, rows):
+    js_ns = '-'
+    if filename in js:
+      js_words = js[filename]['words']
+      js_ns = "{:.0f}".format(js[filename]['ns'] / len(words))
+      result = "ok" if js_words == words else "MISMATCH"
+      failed += js_words != words
+    elif result is None:
+      result = "skipped, no JS runtime"
+    print("{:<32} {:>8} {:>12} {:>12}  {}".format(name,
+      '-' if words is None else "{:,}".format(len(words)),
+      '-' if words is None else "{:.0f}".format(elapsed / len(words) * 1e9),
+      js_ns, result))
+  return 1 if failed else 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,1424 @@
+import array
+import bisect
+import collections
+import copy
+import itertools
+import math
+import os
+import struct
+import sys
+import zlib
+
+from . import container
+from .alphabet import (
+  decode_alphabet,
+  discover_alphabet,
+  encode_alphabet,
+  normalize_lines,
+)
+from .bit_reader import BitReader, MappedBitReader, from_bin, prefix_table
+from .filter import BloomFilter
+from .huffman import Huffman
+from .levels import LevelTrie
+from .louds import LoudsTrie
+from .memory import deep_sizeof
+from .mph import PerfectHash
+from .query import Query
+from .schedule import AnswerSchedule
+from .trie import Trie
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+
+# Root subtree index: symbol id, bit offset into the payload, and the number of
+# words before the subtree.
+INDEX_ENTRY = struct.Struct('>HII')
+
+# Reference from a payload only dictionary to shared tables: CRC32 of their
+# HUFF section, the word length and the number of root subtrees.
+TABLE_REF_ENTRY = struct.Struct('>IBH')
+
+# Shared tables trained on every dictionary in common/, see encode_tables.
+DEFAULT_TABLES = os.path.join(os.path.dirname(__file__), 'tables.bin')
+
+# Subtree sizes for queries to skip the subtrees they rule out, for root
+# subtrees and their children (SKIP_DEPTH levels). See encode_skips.
+SKIP_DEPTH = 2
+
+# Words index_of_many sorts and looks up at a time.
+BATCH_SIZE = 1 << 16
+
+# Chunk index: number of root subtrees, byte offset into the payload, length
+# in bytes, the number of words before the chunk and the chunk's CRC32.
+CHUNK_ENTRY = struct.Struct('>HIIII')
+
+def bit_size(num):
+  return math.ceil(math.log2(num))
+
+# Bits to write any value from 0 to num, at least one.
+def value_size(num):
+  return max(1, num.bit_length())
+
+# Header bit sizes of table lengths and of table entries, which are symbol ids
+# or child counts. Sized for their largest values, so a table of 32 entries or
+# a node with all 32 symbols as children still fits, and a single symbol still
+# gets a bit.
+def table_sizes(tables, num_symbols):
+  counts = [x for x in tables[-1] if isinstance(x, int)]
+  table_size = value_size(max([len(table) for table in tables]))
+  word_size = value_size(max([num_symbols - 1] + counts))
+  return table_size, word_size
+
+def bit_round(num):
+  for x in [8, 16, 32, 64]:
+    if num < x:
+      return x
+  return num
+
+# counts, if given, are the symbol counts at each depth to build the symbol
+# tables from instead of the trie's, see symbol_counts.
+def build_huffmans(trie, max_depth, variable_length=False, counts=None):
+  huffs = []
+  for i in range(max_depth):
+    if counts is None:
+      huffs.append(Huffman.from_counts(trie.counts_at_depth(i)))
+    else:
+      huffs.append(Huffman.from_counts(counts[i]))
+
+  ignore = [] if variable_length else [0]
+  huffs.append(Huffman.from_counts(trie.child_counts(), ignore=ignore))
+  return huffs
+
+def build_shared_huffmans(words):
+  # Tables for fixed length dictionaries of every length in words, by length,
+  # each the tables encode builds for that length on its own.
+  by_length = collections.defaultdict(list)
+  for word in words:
+    by_length[len(word)].append(word)
+  return {length: build_huffmans(Trie(group), length)
+    for length, group in sorted(by_length.items())}
+
+# Symbol counts at each depth of a stream of words, for encode's counts. Items
+# are words or (word, count) pairs, e.g. word frequencies from a corpus, and
+# split turns a word into its symbols (as lesson 6's grams). Only the counts
+# are kept, so the stream can be read lazily from a file of any size.
+def symbol_counts(words, split=None):
+  counts = []
+  for word in words:
+    count = 1
+    if isinstance(word, tuple):
+      word, count = word
+    if split is not None:
+      word = split(word)
+    for i, symbol in enumerate(word):
+      if i == len(counts):
+        counts.append(collections.Counter())
+      counts[i][symbol] += count
+  return counts
+
+class WordleHuffmanTrie:
+  def __init__(self, variable_length=False):
+    self.bits = None
+    self.table_size = 0
+    self.word_size = 0
+    self.num_tables = 0
+    self.num_symbols = 0
+    self.header_size = 0
+    self.huff_size = 0
+    self.payload_size = 0
+    self.i = 0
+    self.huffs = []
+    self.tables = []
+    self.codes = []
+    self.offsets = []
+    self.chunks = []
+    self.filter = None
+    self.mph = None
+    self.schedule = None
+    self.shared = None
+    # A shared table file's tables by word length, see load_tables.
+    self.table_sets = {}
+    self.levels = None
+    self.skips = []
+    self.leaf_depth = 0
+    self.num_words = 0
+    self.container = None
+    # How load holds the payload, 'bits' or 'mapped', see load's budget.
+    self.representation = 'bits'
+    self.variable_length = variable_length
+
+  # Symbols map each symbol to its id, or are a sequence in id order. shared is
+  # a trie from load_tables, whose tables and alphabet are used instead, in
+  # which case the words must all be the same length. layout 'bytes' encodes a
+  # fixed length dictionary as a LevelTrie instead, bigger but quicker to
+  # decode and look up, and 'louds' as a LoudsTrie, about the same size but
+  # with random access to any word. Both need a container.
+  # counts are symbol counts at each depth to build the tables from in place
+  # of the words' own, e.g. symbol_counts of a weighted corpus. symbols None
+  # uses the words' own alphabet, see discover_alphabet. workers encodes each
+  # root subtree in a pool of that many processes, to the same bytes.
+  def encode(self, words, symbols=None, shared=None, layout='huffman',
+      counts=None, workers=None):
+    from bitstring import BitArray
+
+    if layout not in ('huffman', 'bytes', 'louds'):
+      raise ValueError("Layout is 'huffman', 'bytes' or 'louds', not {!r}."
+        .format(layout))
+    if counts is not None and (shared is not None or layout == 'bytes'):
+      raise ValueError("Symbol counts are for layouts with their own Huffman "
+        "tables.")
+    if symbols is None and shared is None:
+      symbols = discover_alphabet(words)
+    self.words = words
+    max_len = max(map(len, self.words))
+    if counts is not None and len(counts) < max_len:
+      raise ValueError("Expected symbol counts for each of {} depths.".format(
+        max_len))
+    self.shared = shared
+    self.levels = None
+    if layout != 'huffman':
+      if self.variable_length or shared is not None or (
+          len(set(map(len, words))) != 1):
+        raise ValueError("The {} layout is for fixed length dictionaries "
+          "with their own alphabet.".format(layout))
+      if not isinstance(symbols, dict):
+        symbols = dict(zip(symbols, range(len(symbols))))
+      self.symbols = symbols
+      trie = Trie(self.words)
+      if layout == 'bytes':
+        self.levels = LevelTrie.build(trie, symbols)
+      else:
+        # Just the symbol tables, the levels replace the child counts.
+        self.huffs = build_huffmans(trie, max_len, counts=counts)[:-1]
+        self.tables = [huff.code for huff in self.huffs]
+        self._write_tables()
+        try:
+          self.levels = LoudsTrie.build(trie, self.tables, symbols)
+        except KeyError as e:
+          raise ValueError("{!r} has no code in the symbol counts.".format(
+            e.args[0]))
+      self.num_words = len(self.levels)
+      self.num_symbols = self.levels.sizes[0]
+      self.leaf_depth = len(self.levels.sizes) - 1
+      return
+    if workers is None or workers < 2:
+      trie = Trie(self.words, variable_length=self.variable_length)
+      self._encode_huffman(symbols, shared, counts, max_len, trie)
+      return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as pool:
+      self._encode_huffman(symbols, shared, counts, max_len, None, pool)
+
+  # Tables and payload for encode, from the trie or, with a process pool,
+  # from root subtrees counted and encoded in the workers.
+  def _encode_huffman(self, symbols, shared, counts, max_len, trie, pool=None):
+    if pool is not None:
+      groups = _root_groups(self.words)
+    if shared is None:
+      if not isinstance(symbols, dict):
+        symbols = dict(zip(symbols, range(len(symbols))))
+      self.symbols = symbols
+      if pool is None:
+        self.huffs = build_huffmans(trie, max_len,
+          variable_length=self.variable_length, counts=counts)
+      else:
+        self.huffs = self._count_subtrees(pool, groups, max_len, counts)
+      self.tables = [huff.code for huff in self.huffs]
+    else:
+      if self.variable_length or len(set(map(len, self.words))) != 1:
+        raise ValueError("Shared tables need words of a single length.")
+      if max_len not in shared.table_sets:
+        raise ValueError("Shared tables have no {} letter words.".format(
+          max_len))
+      self.symbols = dict(zip(shared.symbols, range(len(shared.symbols))))
+      self.huffs = []
+      self.tables = shared.table_sets[max_len]._code_lists()
+    self._write_tables()
+
+    # Encode the payload.
+    self.offsets = []
+    self.skips = []
+    self.num_words = 0
+    try:
+      if pool is None:
+        self._encode_trie(trie.trie)
+      else:
+        self._encode_subtrees(pool, groups)
+    except KeyError as e:
+      if shared is None and counts is None:
+        raise
+      raise ValueError("{!r} has no code in the {}.".format(e.args[0],
+        'symbol counts' if shared is None else 'shared tables'))
+    if shared is not None:
+      self.num_symbols = len(trie.trie) if pool is None else len(groups)
+      self.leaf_depth = len(self.words[0]) - 1
+    self.payload_size = len(self.bits) - self.header_size - self.huff_size
+
+  # Merges the workers' counts in root order, which keeps every symbol and
+  # child count in the order build_huffmans sees them, so ties break the same.
+  def _count_subtrees(self, pool, groups, max_len, counts):
+    depths = [collections.Counter() for i in range(max_len)]
+    children = collections.Counter()
+    for subtree_depths, subtree_children in pool.map(_subtree_counts, groups,
+        itertools.repeat(0 if counts is not None else max_len),
+        itertools.repeat(self.variable_length)):
+      for depth, subtree_depth in zip(depths, subtree_depths):
+        depth.update(subtree_depth)
+      children.update(subtree_children)
+    if counts is not None:
+      depths = counts[:max_len]
+    ignore = [] if self.variable_length else [0]
+    return [Huffman.from_counts(x) for x in depths] + [
+      Huffman.from_counts(children, ignore=ignore)]
+
+  # Appends the workers' payloads, with the root offsets and skips they imply.
+  def _encode_subtrees(self, pool, groups):
+    from bitstring import Bits
+
+    pieces = []
+    offset = 0
+    for words, (data, length, skips, num_words) in zip(groups, pool.map(
+        _subtree_payload, groups, itertools.repeat(self.tables),
+        itertools.repeat(self.symbols), itertools.repeat(self.variable_length))):
+      self.offsets.append((self.symbols[words[0][0]], offset, self.num_words))
+      self.skips += skips
+      self.num_words += num_words
+      pieces.append((int.from_bytes(data, 'big') >> len(data) * 8 - length,
+        length))
+      offset += length
+    value, length = _stitch(pieces)
+    pad = -length % 8
+    self.bits.append(Bits(bytes=(value << pad).to_bytes((length + pad) // 8,
+      'big'), length=length))
+
+  # Trains tables for fixed length dictionaries of each length in words, and
+  # writes each length's header and tables one after another (see totables).
+  def encode_tables(self, words, symbols=None):
+    from bitstring import BitArray
+
+    if symbols is None:
+      symbols = discover_alphabet(words)
+    if not isinstance(symbols, dict):
+      symbols = dict(zip(symbols, range(len(symbols))))
+    self.words = words
+    self.symbols = symbols
+    bits = BitArray()
+    for huffs in build_shared_huffmans(words).values():
+      tables = WordleHuffmanTrie()
+      tables.symbols = symbols
+      tables.tables = [huff.code for huff in huffs]
+      tables._write_tables()
+      bits.append(tables.bits.bits)
+    self.bits = BitReader(bits, char_map=symbols)
+
+  # Encodes sorted words to the same bytes as encode, in two passes over them
+  # and without building the trie. The first counts the symbols at each depth
+  # and every node's children with a stack of the nodes still open, keeping
+  # just the child counts in preorder. The second writes the nodes each word
+  # adds past its common prefix with the word before. words is a file of one
+  # word per line, or a callable returning an iterator, as it is read twice.
+  def encode_stream(self, words, symbols=None):
+    if symbols is None:
+      # One more pass, the words are not kept.
+      symbols = discover_alphabet(_sorted_words(words))
+    if not isinstance(symbols, dict):
+      symbols = dict(zip(symbols, range(len(symbols))))
+    self.words = None
+    self.symbols = symbols
+    self.shared = None
+    self.levels = None
+    depths, children, degrees = self._stream_counts(_sorted_words(words))
+    if not degrees:
+      raise ValueError("No words to encode.")
+    ignore = [] if self.variable_length else [0]
+    self.huffs = [Huffman.from_counts(x) for x in depths] + [
+      Huffman.from_counts(children, ignore=ignore)]
+    self.tables = [huff.code for huff in self.huffs]
+    self._write_tables()
+    self._stream_payload(_sorted_words(words), degrees)
+    self.payload_size = len(self.bits) - self.header_size - self.huff_size
+
+  def _stream_counts(self, words):
+    depths = []
+    children = collections.Counter()
+    # Each child count's first node in preorder, which is the order the
+    # trie's count_children lists them in and so how Huffman breaks ties.
+    first = {}
+    degrees = array.array('H')
+    # Open nodes as [preorder position, children, degree slot], the root
+    # first. Ending a word is a flag on the node, not a child.
+    stack = [[0, 0, None]]
+    position = 1
+    prev = ''
+    for word in words:
+      common = len(os.path.commonprefix((prev, word)))
+      while len(stack) > common + 1:
+        self._close_count(stack.pop(), children, first, degrees)
+      for depth in range(common, len(word)):
+        if depth == len(depths):
+          depths.append(collections.Counter())
+        depths[depth][word[depth]] += 1
+        stack[-1][1] += 1
+        stack.append([position, 0, len(degrees)])
+        degrees.append(0)
+        position += 1
+      prev = word
+    while stack:
+      self._close_count(stack.pop(), children, first, degrees)
+    children = collections.Counter({k: children[k]
+      for k in sorted(children, key=first.get)})
+    return depths, children, degrees
+
+  def _close_count(self, node, children, first, degrees):
+    position, count, slot = node
+    # The root has no node in the payload.
+    if slot is None:
+      return
+    children[count] += 1
+    first[count] = min(first.get(count, position), position)
+    degrees[slot] = count
+
+  def _stream_payload(self, words, degrees):
+    self.offsets = []
+    self.skips = []
+    self.num_words = 0
+    start = self.header_size + self.huff_size
+    degrees = iter(degrees)
+    # Skip entries of the open nodes as (depth, slot, start bit, words before),
+    # None below SKIP_DEPTH.
+    stack = []
+    prev = ''
+    for word in words:
+      common = len(os.path.commonprefix((prev, word)))
+      while len(stack) > common:
+        self._close_skip(stack.pop())
+      for depth in range(common, len(word)):
+        k = word[depth]
+        if depth < SKIP_DEPTH:
+          stack.append((depth, len(self.skips), len(self.bits),
+            self.num_words))
+          self.skips.append(None)
+        else:
+          stack.append(None)
+        if depth == 0:
+          self.offsets.append((self.symbols[k], len(self.bits) - start,
+            self.num_words))
+        degree = next(degrees)
+        # Sorted words end at a node before any word extends it, so only the
+        # last node a word adds can end a word.
+        end = self.variable_length and depth == len(word) - 1
+        if end or not (self.variable_length or degree):
+          self.num_words += 1
+        if self.variable_length or degree:
+          self.bits.append(self.tables[-1][degree])
+        if self.variable_length:
+          self.bits.write(1 if end else 0, 1)
+        self.bits.append(self.tables[depth][k])
+      prev = word
+    while stack:
+      self._close_skip(stack.pop())
+
+  def _close_skip(self, skip):
+    if skip is not None:
+      depth, at, node_start, count = skip
+      self.skips[at] = (depth, len(self.bits) - node_start,
+        self.num_words - count)
+
+  def _write_tables(self):
+    from bitstring import BitArray
+
+    self.bits = BitReader(BitArray(), char_map=self.symbols)
+    self.table_size, self.word_size = table_sizes(self.tables,
+      len(self.symbols))
+    self.num_tables = len(self.tables)
+    self.num_symbols = len(self.tables[0])
+
+    # Header.
+    self.bits.write(self.table_size, 8)
+    self.bits.write(self.word_size, 8)
+    self.bits.write(self.num_tables, 8)
+    self.bits.write(self.num_symbols, 16)
+
+    # Encode the Huffman tables.
+    self.header_size = len(self.bits)
+    for table in self.tables:
+      table_len = len(table)
+      if self.variable_length and 'END' in table:
+        table_len -= 1
+      self.bits.write(table_len, self.table_size)
+      for char, binary in table.items():
+        if self.variable_length and char == 'END':
+          continue
+        self.bits.write(char, self.word_size)
+        self.bits.write(len(binary), 8)
+        self.bits.append(binary)
+    self.huff_size = len(self.bits) - self.header_size
+    self.i = len(self.bits) + 1
+
+  def _encode_trie(self, trie, depth=0):
+    for k, v in trie.items():
+      if self.variable_length and k == 'END':
+        continue
+      if depth < SKIP_DEPTH:
+        node_start, count = len(self.bits), self.num_words
+        at = len(self.skips)
+        self.skips.append(None)
+      if depth == 0:
+        start = self.header_size + self.huff_size
+        self.offsets.append((self.symbols[k], len(self.bits) - start,
+          self.num_words))
+      if 'END' in v or not (self.variable_length or v):
+        self.num_words += 1
+      if self.variable_length or v:
+        len_v = len(v)
+        if self.variable_length and 'END' in v:
+          len_v -= 1
+        self.bits.append(self.tables[-1][len_v])
+      if self.variable_length:
+        self.bits.write(1 if 'END' in v else 0, 1)
+      self.bits.append(self.tables[depth][k])
+      self._encode_trie(v, depth+1)
+      if depth < SKIP_DEPTH:
+        self.skips[at] = (depth, len(self.bits) - node_start,
+          self.num_words - count)
+
+  # With a budget in bytes, raises MemoryError if the list of words would take
+  # the dictionary's memory_report past it, iter_words streams them instead.
+  def decode(self, bits, symbols=None, tables=None, budget=None):
+    self.load(bits, symbols, tables, budget)
+    if self.levels is not None:
+      return self.levels.words()
+
+    # Record where each root subtree starts, unless the container has an index.
+    record = not self.offsets
+    words = []
+    if budget is not None:
+      room = budget - self.memory_report()['total'] - sys.getsizeof(words)
+    for alpha in self._roots():
+      if record:
+        self.offsets.append(
+          (self._peek_symbol(), self.bits.i - self.i, len(words)))
+      subtree = self._read_payload()
+      if budget is not None:
+        # A pointer in the list and the string itself for each word.
+        room -= sum(map(sys.getsizeof, subtree)) + 8 * len(subtree)
+        if room < 0:
+          if record:
+            self.offsets = []
+          raise MemoryError("The decoded words would take the dictionary "
+            "past its budget of {:,} bytes, use iter_words().".format(budget))
+      words += subtree
+    self.payload_size = self.bits.i - self.i
+    return words
+
+  # Accepts either a container or a raw words.bin. Symbols stored in a
+  # container are used unless others are given. tables are the shared tables
+  # (a path, bytes or a trie from load_tables) for a payload only dictionary,
+  # by default the built in DEFAULT_TABLES. With a budget in bytes, the
+  # payload is read in place (from the memory mapped file for paths) if a
+  # string of its bits would not fit, see MappedBitReader.
+  def load(self, bits, symbols=None, tables=None, budget=None):
+    self.container = container.open_container(bits)
+    self.representation = 'bits'
+    self.offsets = []
+    self.chunks = []
+    self.filter = None
+    self.mph = None
+    self.schedule = None
+    self.levels = None
+    self.skips = []
+    self.bits = None
+    if self.container is None:
+      self.bits = self._reader(bits, budget)
+      self._read_tables(self.bits)
+      self.i = self.bits.i
+      self.payload_size = len(self.bits) - self.i
+      # Raw dictionaries carry no alphabet, the clone assumes a-z too.
+      self.symbols = list(ALPHABET) if symbols is None else symbols
+      data = bits
+    else:
+      self._load_container(symbols, tables)
+      if self.levels is None:
+        data = self.container.section(container.PAYLOAD)
+        self.bits = self._reader(data, budget)
+        self.payload_size = len(self.bits)
+    if self.representation == 'bits' and self.bits is not None and (
+        budget is not None and self.memory_report()['total'] > budget):
+      # _reader's estimate leaves out the reader itself and, for raw files,
+      # the tables, which are only read once it has chosen.
+      self.bits = MappedBitReader(data)
+      self.bits.i = self.i
+      self.representation = 'mapped'
+
+  def _reader(self, data, budget):
+    self.representation = 'bits'
+    if budget is None:
+      return BitReader(data)
+    if isinstance(data, (str, os.PathLike)):
+      num_bits = os.path.getsize(data) * 8
+    elif hasattr(data, 'bin'):
+      num_bits = len(data)
+    else:
+      num_bits = memoryview(data).nbytes * 8
+    if sys.getsizeof('') + num_bits + self.memory_report()['total'] <= budget:
+      return BitReader(data)
+    self.representation = 'mapped'
+    return MappedBitReader(data)
+
+  # Heap bytes retained by each part of the dictionary, and their total,
+  # counting objects shared between parts once (see deep_sizeof). words is a
+  # decoded word list to count with it, as a server keeping one would.
+  # Memory mapped files are not counted. The container comes first, so the
+  # file's bytes, which the sections view, are counted as its.
+  def memory_report(self, words=None):
+    seen = set()
+    parts = [
+      ('container', [self.container]),
+      ('bits', [self.bits]),
+      ('tables', [self.tables, self.codes, self.huffs, self.table_sets]),
+      ('index', [self.offsets, self.chunks, self.skips]),
+      ('filter', [self.filter]),
+      ('mph', [self.mph]),
+      ('levels', [self.levels]),
+      ('schedule', [self.schedule]),
+      ('shared', [self.shared]),
+      ('words', [words]),
+    ]
+    report = {}
+    for name, values in parts:
+      report[name] = sum(deep_sizeof(x, seen) for x in values if x is not None)
+    report['total'] = sum(report.values())
+    return report
+
+  # Loads everything but the payload from the start of a chunked container,
+  # e.g. fetched with a Range request, so chunks can be decoded as they arrive
+  # with decode_chunk.
+  def load_head(self, head, symbols=None, tables=None):
+    self.container = container.open_container(head, partial=True)
+    if self.container is None:
+      raise container.ContainerError("Not a container.")
+    self._load_container(symbols, tables)
+    self.bits = None
+
+  # Loads a shared table file written by totables, to encode with or to decode
+  # the dictionaries referring to it.
+  def load_tables(self, source=DEFAULT_TABLES):
+    self.container = container.open_container(source)
+    if self.container is None or container.PAYLOAD in self.container:
+      raise container.ContainerError("Not a shared table file.")
+    self.symbols = decode_alphabet(self.container.section(container.SYMBOLS))
+    # Each length's tables, a table per letter and one of child counts, up to
+    # the padding at the end. Their prefix tables are built for just the
+    # lengths loaded, see _load_shared.
+    bits = BitReader(self.container.section(container.TABLES))
+    self.table_sets = {}
+    while len(bits) - bits.i >= 8:
+      tables = WordleHuffmanTrie()
+      tables.symbols = self.symbols
+      tables._read_tables(bits, codes=False)
+      self.table_sets[tables.num_tables - 1] = tables
+    self.bits = None
+
+  def _load_container(self, symbols, tables=None):
+    self.variable_length = bool(
+      self.container.flags & container.FLAG_VARIABLE_LENGTH)
+    self.shared = None
+    self.levels = None
+    ref = self.container.get(container.TABLE_REF)
+    if ref is not None:
+      symbols = self._load_shared(ref, tables, symbols)
+    elif container.LEVELS not in self.container:
+      self._read_tables(BitReader(self.container.section(container.TABLES)))
+    self.i = 0
+    index = self.container.get(container.INDEX)
+    self.offsets = [] if index is None else self._read_index(index)
+    chunks = self.container.get(container.CHUNKS)
+    self.chunks = [] if chunks is None else list(CHUNK_ENTRY.iter_unpack(chunks))
+    bloom = self.container.get(container.FILTER)
+    self.filter = None if bloom is None else BloomFilter(bloom)
+    mph = self.container.get(container.PERFECT_HASH)
+    self.mph = None if mph is None else PerfectHash(mph)
+    schedule = self.container.get(container.SCHEDULE)
+    self.schedule = None if schedule is None else AnswerSchedule(schedule)
+    skips = self.container.get(container.SKIPS)
+    self.skips = [] if skips is None else decode_skips(skips)
+    if symbols is None:
+      symbols = decode_alphabet(self.container.section(container.SYMBOLS))
+    self.symbols = symbols
+    levels = self.container.get(container.LEVELS)
+    if levels is not None:
+      self.levels = LevelTrie(levels, symbols)
+    louds = self.container.get(container.LOUDS)
+    if louds is not None:
+      self.levels = LoudsTrie(louds, symbols, self.codes)
+    if self.levels is not None:
+      self.num_symbols = self.levels.sizes[0]
+      self.leaf_depth = len(self.levels.sizes) - 1
+
+  def _load_shared(self, ref, tables, symbols):
+    crc, length, num_roots = TABLE_REF_ENTRY.unpack(ref)
+    shared = tables
+    if not isinstance(shared, WordleHuffmanTrie):
+      shared = WordleHuffmanTrie()
+      shared.load_tables(DEFAULT_TABLES if tables is None else tables)
+    if shared.container.sections[container.TABLES][2] != crc:
+      raise container.ContainerError(
+        "Dictionary was encoded with different shared tables.")
+    if length not in shared.table_sets:
+      raise container.ContainerError(
+        "Shared tables have no {} letter words.".format(length))
+    tables = shared.table_sets[length]
+    if not tables.codes:
+      tables.codes = [prefix_table(table) for table in tables.tables]
+    for name in ('table_size', 'word_size', 'num_tables', 'header_size',
+        'huff_size', 'tables', 'codes'):
+      setattr(self, name, getattr(tables, name))
+    self.shared = shared
+    self.num_symbols = num_roots
+    self.leaf_depth = length - 1
+    return list(shared.symbols) if symbols is None else symbols
+
+  def _read_tables(self, bits, codes=True):
+    # Header.
+    start = bits.i
+    self.table_size = bits.read_int(8)
+    self.word_size = bits.read_int(8)
+    self.num_tables = bits.read_int(8)
+    self.num_symbols = bits.read_int(16)
+    self.header_size = bits.i - start
+
+    self.tables = []
+    for i in range(self.num_tables):
+      num_items = bits.read_int(self.table_size)
+      table = {}
+      for j in range(num_items):
+        char = bits.read_int(self.word_size)
+        encoding_size = bits.read_int(8)
+        encoding = bits.read(encoding_size)
+        table[encoding] = char
+      self.tables.append(table)
+    self.huff_size = bits.i - self.header_size
+    if codes:
+      self.codes = [prefix_table(table) for table in self.tables]
+    self.leaf_depth = self.num_tables - 2
+
+  def _peek_symbol(self):
+    i = self.bits.i
+    if self.variable_length or self.leaf_depth > 0:
+      self.bits.read_code(self.codes[-1])
+    if self.variable_length:
+      self.bits.read_int(1)
+    symbol = self.bits.read_code(self.codes[0])
+    self.bits.i = i
+    return symbol
+
+  def _read_index(self, data):
+    return list(INDEX_ENTRY.iter_unpack(data))
+
+  # Moves to each root subtree in turn. Chunks are padded to whole bytes, so
+  # each is seeked to rather than read straight through.
+  def _roots(self):
+    self.bits.i = self.i
+    if not self.chunks:
+      yield from range(self.num_symbols)
+      return
+    for num_roots, offset, length, count, crc in self.chunks:
+      self.bits.i = self.i + offset * 8
+      yield from range(num_roots)
+
+  # The chunk holding words starting with the word's first symbol, if any.
+  def chunk_of(self, word):
+    for symbol, offset, count in self.offsets:
+      if word.startswith(self.symbols[symbol]):
+        for i, chunk in enumerate(self.chunks):
+          if chunk[1] * 8 <= offset < (chunk[1] + chunk[2]) * 8:
+            return i
+    return None
+
+  # Byte range [start, end) of a chunk within the whole container file.
+  def chunk_range(self, i):
+    start = self.container.sections[container.PAYLOAD][0] + self.chunks[i][1]
+    return start, start + self.chunks[i][2]
+
+  # Decodes one chunk on its own, the first word has index words before + 1
+  # (the chunk's fourth field).
+  def decode_chunk(self, i, data):
+    num_roots, offset, length, count, crc = self.chunks[i]
+    if len(data) != length or zlib.crc32(data) != crc:
+      raise container.ContainerError("Chunk {} checksum mismatch.".format(i))
+    bits = self.bits
+    self.bits = BitReader(data)
+    try:
+      words = []
+      for alpha in range(num_roots):
+        words += self._read_payload()
+    finally:
+      self.bits = bits
+    return words
+
+  # Yields the index of each word, or None, in the order given. Words are
+  # taken batch_size at a time, sorted and looked up in one walk of the
+  # subtrees holding them, so an iterator of any length can be checked in
+  # constant memory.
+  def index_of_many(self, words, batch_size=BATCH_SIZE):
+    words = iter(words)
+    while True:
+      batch = list(itertools.islice(words, batch_size))
+      if not batch:
+        return
+      found = self._index_of_sorted(sorted(set(batch)))
+      for word in batch:
+        yield found.get(word)
+
+  def contains_many(self, words, batch_size=BATCH_SIZE):
+    for index in self.index_of_many(words, batch_size):
+      yield index is not None
+
+  # Maps each of the (sorted, unique) words in the dictionary to its index.
+  def _index_of_sorted(self, words):
+    if self.filter is not None:
+      words = [x for x in words if x in self.filter]
+    found = {}
+    if self.levels is not None:
+      for word in words:
+        index = self.levels.index_of(word)
+        if index is not None:
+          found[word] = index
+      return found
+    if self.offsets:
+      # Only the root subtrees holding words are walked.
+      for i, (symbol, offset, count) in enumerate(self.offsets):
+        lo, hi = _prefix_range(words, self.symbols[symbol], 0, len(words))
+        if lo < hi:
+          self.bits.i = self.i + offset
+          self._find_sorted(words, lo, hi, found, count,
+            skip=self.skips[i] if self.skips else None)
+      return found
+    count = 0
+    for i, alpha in enumerate(self._roots()):
+      count = self._find_sorted(words, 0, len(words), found, count,
+        skip=self.skips[i] if self.skips else None)
+    return found
+
+  # words[lo:hi] are the sorted words starting with prefix. Subtrees whose
+  # prefix none of them start with are skipped. Returns the count of words up
+  # to the end of the subtree.
+  def _find_sorted(self, words, lo, hi, found, count, depth=0, prefix='',
+      skip=None):
+    start = self.bits.i
+    num_children, terminates, char = self._read_node(depth)
+    word = prefix + char
+    lo, hi = _prefix_range(words, word, lo, hi)
+    if lo == hi:
+      if skip is not None:
+        self.bits.i = start + skip[0]
+        return count + skip[1]
+      count += bool(terminates or not num_children)
+      return count + self._skip_payload(num_children, depth + 1)
+    if terminates or not num_children:
+      count += 1
+      if words[lo] == word:
+        found[word] = count
+        lo += 1
+    children = None if skip is None else skip[2]
+    for i in range(num_children):
+      count = self._find_sorted(words, lo, hi, found, count, depth + 1, word,
+        children[i] if children else None)
+    return count
+
+  def word_indices(self, words):
+    words = set(words)
+    if self.levels is not None:
+      res = [(word, self.levels.index_of(word)) for word in words]
+      return sorted([x for x in res if x[1] is not None], key=lambda x: x[1])
+    if self.offsets:
+      # Only the root subtrees holding some of the words are walked.
+      found = self._index_of_sorted(sorted(words))
+      return sorted(found.items(), key=lambda x: x[1])
+    count = 0
+    res = []
+    for alpha in self._roots():
+      count, new_words = self._index_of_payload(words, count)
+      res += new_words
+    return res
+
+  # Indices are 1-based, matching word_indices and the answers file. Words the
+  # filter rules out are rejected without walking the trie. The perfect hash
+  # does not help here: checking its index still means walking to the word,
+  # see rank. With skips that walk seeks past the subtrees off the word's path.
+  def index_of(self, word):
+    if self.filter is not None and word not in self.filter:
+      return None
+    if self.levels is not None:
+      return self.levels.index_of(word)
+    if self.offsets and self.skips:
+      return self._index_of_sorted([word]).get(word)
+    if self.offsets:
+      return self._index_of_offsets(word)
+    count = 0
+    for alpha in self._roots():
+      count, found = self._find_payload(word, count)
+      # Root subtrees are contiguous, so once the subtree sharing the word's
+      # first symbol has been walked there is nothing left to search.
+      if found is not None:
+        return count if found else None
+    return None
+
+  def _index_of_offsets(self, word):
+    for symbol, offset, count in self.offsets:
+      if word.startswith(self.symbols[symbol]):
+        self.bits.i = self.i + offset
+        count, found = self._find_payload(word, count)
+        if found is not None:
+          return count if found else None
+    return None
+
+  # The index of a word known to be in the dictionary, in O(1) with a perfect
+  # hash. Other words get an arbitrary index, or None, so use index_of unless
+  # membership has already been checked.
+  def rank(self, word):
+    if self.mph is None:
+      return self.index_of(word)
+    return self.mph.get(word)
+
+  def contains(self, word):
+    return self.index_of(word) is not None
+
+  # The word at a (1-based) index, or None. Level order layouts get straight
+  # to it, otherwise only the root subtree holding it is walked if there is an
+  # index.
+  def word_at(self, index):
+    if self.levels is not None:
+      return self.levels.word_at(index)
+    if index < 1:
+      return None
+    if self.offsets:
+      i = bisect.bisect_left([x[2] for x in self.offsets], index) - 1
+      symbol, offset, count = self.offsets[i]
+      self.bits.i = self.i + offset
+      words = self._iter_payload()
+    else:
+      count = 0
+      words = self.iter_words()
+    for word in words:
+      count += 1
+      if count == index:
+        return word
+    return None
+
+  # A day's answer from the container's SCHD section, or None if the day is
+  # not scheduled.
+  def answer_for_day(self, day):
+    if self.schedule is None:
+      raise ValueError("No answer schedule in this dictionary.")
+    index = self.schedule.answer_for_day(day)
+    return None if index is None else self.word_at(index)
+
+  # Words starting with prefix, in index order.
+  def words_with_prefix(self, prefix):
+    if self.levels is not None:
+      return self.levels.words_with_prefix(prefix)
+    return self.query(Query(prefix=prefix))
+
+  # Words matching a Query, or one built from the keyword arguments (prefix,
+  # pattern, include and exclude), in index order. Subtrees are skipped as
+  # soon as their prefix rules them out: root subtrees by seeking to the next
+  # one if there is an index, and others in one seek if the container has
+  # subtree sizes (tocontainer(skips=True)), or by reading through their nodes.
+  def query(self, query=None, **kwargs):
+    if query is None:
+      query = Query(**kwargs)
+    if self.levels is not None:
+      return self.levels.query(query)
+    res = []
+    if self.offsets:
+      for i, (symbol, offset, count) in enumerate(self.offsets):
+        if query.allows(self.symbols[symbol]):
+          self.bits.i = self.i + offset
+          self._query_payload(query, res,
+            skip=self.skips[i] if self.skips else None)
+      return res
+    for i, alpha in enumerate(self._roots()):
+      self._query_payload(query, res,
+        skip=self.skips[i] if self.skips else None)
+    return res
+
+  # In both modes a node without children ends a word. Variable length nodes
+  # also end one if their terminal bit is set, and fixed length leaves have no
+  # child count stored.
+  def _read_node(self, depth):
+    bits = self.bits
+    num_children = 0
+    if self.variable_length or depth < self.leaf_depth:
+      num_children = bits.read_code(self.codes[-1])
+    terminates = self.variable_length and bits.read_bit()
+    char = self.symbols[bits.read_code(self.codes[depth])]
+    return num_children, terminates, char
+
+  def _read_payload(self, depth=0, prefix=''):
+    # _read_node inlined, as this is the hot path for decode.
+    bits = self.bits
+    num_children = 0
+    if self.variable_length or depth < self.leaf_depth:
+      num_children = bits.read_code(self.codes[-1])
+    terminates = self.variable_length and bits.read_bit()
+    word = prefix + self.symbols[bits.read_code(self.codes[depth])]
+    if not num_children:
+      return [word]
+    words = [word] if terminates else []
+    for i in range(num_children):
+      words += self._read_payload(depth+1, word)
+    return words
+
+  # Yields words as they are decoded, rather than building the whole list.
+  def iter_words(self):
+    if self.levels is not None:
+      yield from self.levels.words()
+      return
+    # With a cursor of its own, so lookups between words do not move it.
+    reader = copy.copy(self)
+    reader.bits = copy.copy(self.bits)
+    for alpha in reader._roots():
+      yield from reader._iter_payload()
+
+  def _iter_payload(self, depth=0, prefix=''):
+    num_children, terminates, char = self._read_node(depth)
+    word = prefix + char
+    if terminates or not num_children:
+      yield word
+    for i in range(num_children):
+      yield from self._iter_payload(depth+1, word)
+
+  def _index_of_payload(self, words, count=0, depth=0, prefix=''):
+    num_children, terminates, char = self._read_node(depth)
+    word = prefix + char
+    res = []
+    if terminates or not num_children:
+      count += 1
+      if word in words:
+        res.append((word, count))
+    for i in range(num_children):
+      count, new_words = self._index_of_payload(words, count, depth+1, word)
+      res += new_words
+    return count, res
+
+  # skip is the subtree's (bits, words, children) from the SKIP section.
+  def _query_payload(self, query, res, depth=0, prefix='', skip=None):
+    start = self.bits.i
+    num_children, terminates, char = self._read_node(depth)
+    word = prefix + char
+    if not query.allows(word, len(prefix)):
+      if skip is not None:
+        self.bits.i = start + skip[0]
+      else:
+        self._skip_payload(num_children, depth + 1)
+      return
+    if (terminates or not num_children) and query.matches(word):
+      res.append(word)
+    children = None if skip is None else skip[2]
+    for i in range(num_children):
+      self._query_payload(query, res, depth + 1, word,
+        children[i] if children else None)
+
+  # Reads past the children of a node, returning the number of words in them.
+  def _skip_payload(self, num_children, depth):
+    count = 0
+    for i in range(num_children):
+      num_grandchildren, terminates, char = self._read_node(depth)
+      count += bool(terminates or not num_grandchildren)
+      count += self._skip_payload(num_grandchildren, depth + 1)
+    return count
+
+  # Returns the count of words up to and including the word, and whether it
+  # was found: None if the subtree is off the word's path (and was skipped
+  # over in full), False if the word is not in the dictionary.
+  def _find_payload(self, word, count=0, depth=0, prefix=''):
+    num_children, terminates, char = self._read_node(depth)
+    if prefix is not None:
+      prefix += char
+      if not word.startswith(prefix):
+        prefix = None
+    if terminates or not num_children:
+      count += 1
+      if prefix == word:
+        return count, True
+    if prefix == word:
+      # Anything below is longer than the word.
+      return count, False
+    for i in range(num_children):
+      count, found = self._find_payload(word, count, depth+1, prefix)
+      if found is not None:
+        return count, found
+    return count, None if prefix is None else False
+
+  def print_debug(self):
+    if self.levels is not None:
+      louds = isinstance(self.levels, LoudsTrie)
+      print("Layout:", 'louds' if louds else 'bytes')
+      print("Num Symbols", self.num_symbols)
+      for i, size in enumerate(self.levels.sizes):
+        print("Level {} (Nodes):".format(i), size)
+      if louds:
+        print("Tables (Bytes):", math.ceil(
+          (self.header_size + self.huff_size) / 8))
+      print("Levels (Bytes):", len(self.levels.tobytes()))
+      if self.container is not None:
+        print("Filesize (Bytes):", len(self.container.data))
+      print("")
+      return
+    print("Table Size Bits:", self.table_size)
+    print("Huffman Table Word Bits:", self.word_size)
+    print("Num Tables:", self.num_tables)
+    print("Num Symbols", self.num_symbols)
+    for i, table in enumerate(self.tables):
+      print("Table {}:".format(i), len(table))
+    print("")
+    print("Header (Bytes):", math.ceil(self.header_size / 8))
+    print("Tables (Bytes):", math.ceil(self.huff_size / 8))
+    print("Payload (Bytes):", math.ceil(self.payload_size / 8))
+    if self.shared is not None:
+      # The header and tables above are the shared file's, not in this one.
+      print("Shared Tables (Bytes):", len(self.shared.container.data))
+      print("Word Length:", self.leaf_depth + 1)
+    if self.container is None:
+      print("Filesize (Bytes):", math.ceil(len(self.bits) / 8))
+    else:
+      for tag, (offset, length, crc) in self.container.sections.items():
+        print("Section {} (Bytes):".format(tag.decode('ascii')), length)
+      if self.chunks:
+        print("Chunks:", len(self.chunks))
+        print("Largest Chunk (Bytes):", max(x[2] for x in self.chunks))
+        print("Head (Bytes):",
+          self.container.sections[container.PAYLOAD][0])
+      if self.filter is not None:
+        print("Filter Hashes:", self.filter.hashes)
+        print("Filter Bits/Word: {:0.2f}".format(self.filter.bits_per_word()))
+        print("Filter False Positive Rate (Target): {:0.3%}".format(
+          self.filter.rate))
+        print("Filter False Positive Rate (Expected): {:0.3%}".format(
+          self.filter.false_positive_rate()))
+      if self.mph is not None:
+        print("Perfect Hash Levels:", len(self.mph.sizes))
+        print("Perfect Hash Bits/Word: {:0.2f}".format(self.mph.bits_per_key()))
+        print("Perfect Hash Index Bits/Word:", self.mph.width)
+      print("Filesize (Bytes):", len(self.container.data))
+    print("")
+
+  def print_huffman_stats(self):
+    for i, huff in enumerate(self.huffs):
+      print("Huffman Table: {}".format(i+1))
+      total = sum([x[1] for x in huff.freqs])
+      smaller = 0
+      bigger = 0
+      for k, v in sorted(huff.freqs, key=lambda x: x[1], reverse=True):
+        if len(huff.code[k]) < 5:
+          smaller += v
+        if len(huff.code[k]) > 5:
+          bigger += v
+        print("{} | {} | {} | {:0.1f}%".format(k, "".join(map(str, huff.code[k])), v,
+          v/total*100))
+      print("Smaller: {:0.1f}%".format(smaller / total * 100))
+      print("Bigger: {:0.1f}%".format(bigger / total * 100))
+      print("")
+
+  def tobytes(self):
+    if self.shared is not None or self.levels is not None:
+      raise ValueError("Dictionaries using shared tables, or the bytes or louds "
+        "layout, need a container.")
+    return self.bits.tobytes()
+
+  # Encodes words with the loaded tables, without rebuilding them, and returns
+  # the payload as a string of bits. Raises KeyError if a symbol or child
+  # count has no code.
+  def encode_payload(self, words):
+    return self._payload_encoder(words).bits.bits.bin
+
+  # Subtree sizes of the payload encode_payload gives, as for encode_skips.
+  def payload_skips(self, words):
+    return self._payload_encoder(words).skips
+
+  def _payload_encoder(self, words):
+    from bitstring import BitArray
+
+    symbols = list(self.symbols)
+    encoder = WordleHuffmanTrie(variable_length=self.variable_length)
+    encoder.symbols = dict(zip(symbols, range(len(symbols))))
+    encoder.tables = self._code_lists()
+    encoder.bits = BitReader(BitArray(), char_map=encoder.symbols)
+    encoder._encode_trie(Trie(words, variable_length=self.variable_length).trie)
+    return encoder
+
+  # Loaded tables the other way around, as encode builds them.
+  def _code_lists(self):
+    symbols = list(self.symbols)
+    tables = [{symbols[v]: [int(x) for x in k] for k, v in table.items()}
+      for table in self.tables[:-1]]
+    tables.append({v: [int(x) for x in k] for k, v in self.tables[-1].items()})
+    return tables
+
+  # The alphabet and tables from encode_tables, as a container.
+  def totables(self):
+    return container.write_container([
+      (container.SYMBOLS, encode_alphabet(
+        sorted(self.symbols, key=self.symbols.get))),
+      (container.TABLES, from_bin(self.bits.bits.bin)),
+    ])
+
+  # chunks splits the payload into independently decodable chunks, either
+  # 'letter' for one per root subtree or a size in bytes to group them up to.
+  # filter_rate adds a Bloom filter of the words with that false positive rate,
+  # mph a perfect hash from each word to its index and skips the subtree sizes
+  # that let queries skip what they rule out.
+  # answers are an answers.bin (from encode_answers) and schedule an
+  # AnswerSchedule's bytes.
+  def tocontainer(self, answers=None, index=True, chunks=None,
+      filter_rate=None, mph=False, skips=False, schedule=None):
+    flags = container.FLAG_VARIABLE_LENGTH if self.variable_length else 0
+    if self.levels is not None:
+      if chunks is not None:
+        raise ValueError("Level order layouts cannot be chunked.")
+      sections = [(container.SYMBOLS, encode_alphabet(
+        sorted(self.symbols, key=self.symbols.get)))]
+      if isinstance(self.levels, LoudsTrie):
+        sections += [
+          (container.TABLES, self.bits.tobytes()),
+          (container.LOUDS, self.levels.tobytes()),
+        ]
+      else:
+        sections.append((container.LEVELS, self.levels.tobytes()))
+    else:
+      sections, offsets, entries = self._payload_sections(chunks)
+    # Lookups find their own way down the levels, without an index.
+    if self.levels is None and (index or chunks is not None or mph):
+      sections.append((container.INDEX, b''.join(
+        INDEX_ENTRY.pack(*entry) for entry in offsets)))
+    if chunks is not None:
+      sections.append((container.CHUNKS, b''.join(
+        CHUNK_ENTRY.pack(*entry) for entry in entries)))
+    if answers is not None:
+      sections.append((container.ANSWERS, answers))
+    if schedule is not None:
+      sections.append((container.SCHEDULE, schedule))
+    if self.words is None and (filter_rate is not None or mph):
+      raise ValueError("Filters and perfect hashes need the words, which "
+        "encode_stream does not keep.")
+    if filter_rate is not None:
+      sections.append((container.FILTER,
+        BloomFilter.build(self.words, filter_rate).tobytes()))
+    if skips and self.levels is None:
+      sections.append((container.SKIPS, encode_skips(self.skips)))
+    if mph:
+      words = Trie(self.words, variable_length=self.variable_length).words()
+      sections.append((container.PERFECT_HASH, PerfectHash.build(
+        words, range(1, len(words) + 1)).tobytes()))
+    if chunks is not None:
+      # The payload goes last so the rest is one Range request.
+      payload_at = [tag for tag, data in sections].index(container.PAYLOAD)
+      sections.append(sections.pop(payload_at))
+    return container.write_container(sections, flags=flags)
+
+  def _payload_sections(self, chunks):
+    bits = self.bits.bits.bin
+    start = self.header_size + self.huff_size
+    offsets = self.offsets
+    entries = None
+    if chunks is None:
+      payload = from_bin(bits[start:])
+    else:
+      payload, offsets, entries = self._chunk_payload(bits[start:], chunks)
+    if self.shared is None:
+      sections = [
+        (container.SYMBOLS, encode_alphabet(
+          sorted(self.symbols, key=self.symbols.get))),
+        (container.TABLES, from_bin(bits[:start])),
+        (container.PAYLOAD, payload),
+      ]
+    else:
+      # Just the payload, the alphabet and tables are in the shared file.
+      sections = [
+        (container.TABLE_REF, TABLE_REF_ENTRY.pack(
+          self.shared.container.sections[container.TABLES][2],
+          self.leaf_depth + 1, self.num_symbols)),
+        (container.PAYLOAD, payload),
+      ]
+    return sections, offsets, entries
+
+  def _chunk_payload(self, bits, chunks):
+    if chunks != 'letter' and (not isinstance(chunks, int) or chunks < 1):
+      raise ValueError("Chunks are 'letter' or a size in bytes, not {!r}.".format(
+        chunks))
+    bounds = [entry[1] for entry in self.offsets] + [len(bits)]
+    groups = []
+    for i in range(len(self.offsets)):
+      size = bounds[i + 1] - bounds[i]
+      if groups and chunks != 'letter' and (
+          (groups[-1][1] + size + 7) // 8 <= chunks):
+        groups[-1][0].append(i)
+        groups[-1][1] += size
+      else:
+        groups.append([[i], size])
+
+    payload = b''
+    offsets = []
+    entries = []
+    for roots, size in groups:
+      position = len(payload) * 8
+      for i in roots:
+        symbol, offset, count = self.offsets[i]
+        offsets.append((symbol, position, count))
+        position += bounds[i + 1] - bounds[i]
+      data = from_bin(bits[bounds[roots[0]]:bounds[roots[-1] + 1]])
+      entries.append((len(roots), len(payload), len(data),
+        self.offsets[roots[0]][2], zlib.crc32(data)))
+      payload += data
+    return payload, offsets, entries
+
+# The words of each root subtree, in the order Trie puts the subtrees.
+def _root_groups(words):
+  groups = {}
+  for word in words:
+    groups.setdefault(word[0], []).append(word)
+  return list(groups.values())
+
+# Worker side of encode(workers=...): the symbol counts at each depth and the
+# child counts of one root subtree.
+def _subtree_counts(words, max_depth, variable_length):
+  trie = Trie(words, variable_length=variable_length)
+  return ([trie.counts_at_depth(i) for i in range(max_depth)],
+    trie.child_counts())
+
+# The payload of one root subtree as bytes and its length in bits, with its
+# skips and number of words.
+def _subtree_payload(words, tables, symbols, variable_length):
+  from bitstring import BitArray
+
+  encoder = WordleHuffmanTrie(variable_length=variable_length)
+  encoder.symbols = symbols
+  encoder.tables = tables
+  encoder.bits = BitReader(BitArray(), char_map=symbols)
+  encoder._encode_trie(Trie(words, variable_length=variable_length).trie)
+  return (encoder.bits.bits.tobytes(), len(encoder.bits), encoder.skips,
+    encoder.num_words)
+
+# Joins (value, bit length) pieces into one, a half at a time so each bit is
+# shifted about log2(len(pieces)) times rather than once per piece after it.
+def _stitch(pieces):
+  if len(pieces) == 1:
+    return pieces[0]
+  mid = len(pieces) // 2
+  high, high_length = _stitch(pieces[:mid])
+  low, low_length = _stitch(pieces[mid:])
+  return high << low_length | low, high_length + low_length
+
+# Words for encode_stream, checking they are sorted and dropping repeats.
+def _sorted_words(words):
+  if callable(words):
+    lines = words()
+  else:
+    lines = _read_lines(words)
+  prev = None
+  for word in lines:
+    if not word:
+      raise ValueError("Cannot encode an empty word.")
+    if prev is not None and word <= prev:
+      if word == prev:
+        continue
+      raise ValueError("Words are not sorted, {!r} follows {!r}.".format(
+        word, prev))
+    yield word
+    prev = word
+
+# Normalized as encode's words are, so the sort check in _sorted_words sees
+# the same words.
+def _read_lines(filename):
+  with open(filename, 'r') as fp:
+    yield from normalize_lines(fp)
+
+# The range of sorted words[lo:hi] starting with prefix.
+def _prefix_range(words, prefix, lo, hi):
+  lo = bisect.bisect_left(words, prefix, lo, hi)
+  end = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+  return lo, bisect.bisect_left(words, end, lo, hi)
+
+def _write_varint(out, num):
+  while num > 0x7f:
+    out.append(0x80 | num & 0x7f)
+    num >>= 7
+  out.append(num)
+
+def _read_varint(data, i):
+  num = shift = 0
+  while True:
+    byte = data[i]
+    i += 1
+    num |= (byte & 0x7f) << shift
+    shift += 7
+    if not byte & 0x80:
+      return num, i
+
+# The SKIP section: for each root subtree, the bits and words in it and the
+# number of its children, then the bits and words in each child's subtree,
+# all as LEB128 varints. skips are (depth, bits, words) in preorder.
+def encode_skips(skips):
+  out = bytearray()
+  for i, (depth, num_bits, num_words) in enumerate(skips):
+    if depth:
+      _write_varint(out, num_bits)
+      _write_varint(out, num_words)
+      continue
+    children = 0
+    while i + 1 + children < len(skips) and skips[i + 1 + children][0]:
+      children += 1
+    for num in (num_bits, num_words, children):
+      _write_varint(out, num)
+  return bytes(out)
+
+# Returns (bits, words, children) per root subtree, with (bits, words, None)
+# per child.
+def decode_skips(data):
+  skips = []
+  i = 0
+  while i < len(data):
+    num_bits, i = _read_varint(data, i)
+    num_words, i = _read_varint(data, i)
+    num_children, i = _read_varint(data, i)
+    children = []
+    for j in range(num_children):
+      child_bits, i = _read_varint(data, i)
+      child_words, i = _read_varint(data, i)
+      children.append((child_bits, child_words, None))
+    skips.append((num_bits, num_words, children))
+  return skips
+
+def answer_index(data, day):
+  # The (1-based) word index of one day's answer, or None if the day is not
+  # scheduled. Indices are fixed width, so this reads just that one field.
+  day_offset = (data[0] << 8) | data[1]
+  day_count = data[2]
+  i = day - day_offset
+  if not 0 <= i < day_count:
+    return None
+  width = (len(data) - 3) // day_count
+  start = 3 + i * width
+  return int.from_bytes(data[start:start + width], 'big')
+
+def decode_answers(data):
+  data = bytes(data)
+  day_offset = int.from_bytes(data[0:2], 'big')
+  indices = [answer_index(data, day)
+    for day in range(day_offset, day_offset + data[2])]
+  return day_offset, indices
+
+def encode_answers(indices, day_offset, num_words):
+  from bitstring import BitArray
+
+  if len(indices) > 255:
+    raise ValueError("At most 255 days of answers can be encoded.")
+  bits = BitReader(BitArray())
+  num_bits = bit_round(bit_size(num_words - 1))
+  bits.write(day_offset, 16) # 66,536 days total.
+  bits.write(len(indices), 8) # 256 days max.
+  for idx in indices:
+    bits.write(idx, num_bits)
+  return bits.bits.tobytes()
+
@@ -0,0 +1,99 @@
+import hashlib
+import math
+import struct
+
+from .memory import MemoryReport
+
+# Blocked Bloom filter, as stored in a container's BLOM section:
+#
+#   hashes  B  bits set per word
+#   blocks  I  number of BLOCK_BITS bit blocks
+#   count   I  number of words added
+#   rate    f  false positive rate the filter was sized for
+#   bits       blocks * BLOCK_BYTES bytes
+#
+# A word's bits all fall in one 512 bit (cache line) block. The block, and 9
+# bits for each position within it, come from a single BLAKE2b hash of the
+# UTF-8 word, so a check costs one hash and touches one block.
+HEADER = struct.Struct('>BIIf')
+BLOCK_BITS = 512
+BLOCK_BYTES = BLOCK_BITS // 8
+# Positions that fit in BLAKE2b's largest (64 byte) digest.
+MAX_HASHES = (64 - 4) * 8 // 9
+
+DEFAULT_RATE = 0.01
+
+def _positions(word, hashes, blocks):
+  h = int.from_bytes(hashlib.blake2b(word.encode('utf-8'),
+    digest_size=4 + (hashes * 9 + 7) // 8).digest(), 'little')
+  start = (h & 0xffffffff) % blocks * BLOCK_BITS
+  h >>= 32
+  positions = []
+  for i in range(hashes):
+    positions.append(start + (h & (BLOCK_BITS - 1)))
+    h >>= 9
+  return positions
+
+def _expected_rate(bits_per_word, hashes):
+  # Words per block are roughly Poisson distributed, and fuller blocks give
+  # more false positives than the load on the filter as a whole suggests.
+  mean = BLOCK_BITS / bits_per_word
+  p = math.exp(-mean)
+  total = 0
+  for n in range(int(mean * 4) + 50):
+    if n:
+      p *= mean / n
+    total += p * (1 - (1 - 1 / BLOCK_BITS) ** (hashes * n)) ** hashes
+  return total
+
+class BloomFilter(MemoryReport):
+  def __init__(self, data):
+    self.data = memoryview(data)
+    if len(self.data) < HEADER.size:
+      raise ValueError("Truncated filter header.")
+    self.hashes, self.blocks, self.count, self.rate = HEADER.unpack_from(
+      self.data)
+    self.bits = self.data[HEADER.size:]
+    if len(self.bits) != self.blocks * BLOCK_BYTES or not self.blocks:
+      raise ValueError("Expected {} blocks of filter bits.".format(self.blocks))
+
+  # Starts from the unblocked size of -ln(rate) / ln(2)^2 bits per word, and
+  # grows it until blocking still meets the rate, about 9.9 bits for 1%.
+  @classmethod
+  def build(cls, words, rate=DEFAULT_RATE):
+    if not 0 < rate < 1:
+      raise ValueError("False positive rate must be between 0 and 1.")
+    words = set(words)
+    bits_per_word = -math.log(rate) / math.log(2) ** 2
+    hashes = min(max(1, round(bits_per_word * math.log(2))), MAX_HASHES)
+    while _expected_rate(bits_per_word, hashes) > rate:
+      bits_per_word *= 1.01
+    blocks = max(1, math.ceil(len(words) * bits_per_word / BLOCK_BITS))
+    bits = bytearray(blocks * BLOCK_BYTES)
+    for word in words:
+      for i in _positions(word, hashes, blocks):
+        bits[i >> 3] |= 0x80 >> (i & 7)
+    return cls(HEADER.pack(hashes, blocks, len(words), rate) + bytes(bits))
+
+  def __contains__(self, word):
+    bits = self.bits
+    for i in _positions(word, self.hashes, self.blocks):
+      if not bits[i >> 3] & (0x80 >> (i & 7)):
+        return False
+    return True
+
+  def bits_per_word(self):
+    return len(self.bits) * 8 / max(1, self.count)
+
+  # Expected rate for the filter as built, averaged over blocks since fuller
+  # blocks give more false positives.
+  def false_positive_rate(self):
+    total = 0
+    for i in range(self.blocks):
+      block = self.bits[i * BLOCK_BYTES:(i + 1) * BLOCK_BYTES]
+      ones = bin(int.from_bytes(block, 'big')).count('1')
+      total += (ones / BLOCK_BITS) ** self.hashes
+    return total / self.blocks
+
+  def tobytes(self):
+    return bytes(self.data)
@@ -6,18 +6,34 @@ class Tree:
     self.right = right
 
 class Huffman:
-  def __init__(self, string, ignore=None):
+  # string is the symbols to count, or counts a mapping (or iterable of pairs)
+  # of symbol to count, so the table is built in memory for the distinct
+  # symbols only. Ties keep the order symbols were first seen either way.
+  def __init__(self, string=(), ignore=None, counts=None):
     ignore = ignore or []
-    self.freqs = self.count_frequencies(string, ignore)
+    self.freqs = self.count_frequencies(string, ignore, counts)
     self._tree = self.construct_frequency_tree()
     self.code = self.generate_huffman_code(self._tree[0][0], [])
 
-  def count_frequencies(self, string, ignore):
+  @classmethod
+  def from_counts(cls, counts, ignore=None):
+    return cls(ignore=ignore, counts=counts)
+
+  def count_frequencies(self, string, ignore, counts=None):
     freq = collections.defaultdict(int)
     for char in string:
       if char in ignore:
         continue
       freq[char] += 1
+    if counts is not None:
+      if hasattr(counts, 'items'):
+        counts = counts.items()
+      for char, count in counts:
+        if char in ignore:
+          continue
+        freq[char] += count
+    if not freq:
+      raise ValueError("No symbols to build a Huffman table from.")
     return sorted(freq.items(), key=lambda x: x[1], reverse=True)
 
   def construct_frequency_tree(self):
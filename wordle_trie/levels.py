@@ -0,0 +1,209 @@
+import bisect
+import itertools
+import operator
+import struct
+
+from .memory import MemoryReport
+
+# Byte aligned trie for fixed length dictionaries, as stored in a container's
+# LVLS section:
+#
+#   levels  B  number of levels, the word length in symbols
+#   sizes   levels * I, nodes at each level
+#   labels  a byte per node, its symbol id, level by level
+#   counts  a byte per node above the last level, its number of children
+#
+# Nodes are in level order (as in LOUDS), so the children of one level's nodes
+# are contiguous at the next, node j's starting after the children of the
+# nodes before it. The last level's nodes are the words in index order.
+# Decoding repeats each prefix by its child count and lookups are a bytes.find
+# per symbol, without reading any Huffman codes, at a bit over twice the size.
+HEADER = struct.Struct('>B')
+SIZE = struct.Struct('>I')
+
+def level_order(trie):
+  # Each level's symbols and child counts, in level order.
+  labels = []
+  counts = []
+  level = [trie.trie]
+  while level and any(level):
+    labels.append([k for node in level for k in node])
+    level = [v for node in level for v in node.values()]
+    counts.append([len(node) for node in level])
+  # Only the last level has nodes without children.
+  counts.pop()
+  if any(0 in x for x in counts):
+    raise ValueError("Level tries need words of a single length.")
+  return labels, counts
+
+class LevelTrie(MemoryReport):
+  # symbols are the alphabet in id order.
+  def __init__(self, data, symbols):
+    data = memoryview(data)
+    if len(data) < HEADER.size:
+      raise ValueError("Truncated level trie header.")
+    num_levels, = HEADER.unpack_from(data)
+    i = HEADER.size
+    self.sizes = [SIZE.unpack_from(data, i + j * SIZE.size)[0]
+      for j in range(num_levels)]
+    i += SIZE.size * num_levels
+    self.labels = []
+    for size in self.sizes:
+      self.labels.append(bytes(data[i:i + size]))
+      i += size
+    self.counts = []
+    for size in self.sizes[:-1]:
+      self.counts.append(bytes(data[i:i + size]))
+      i += size
+    if not num_levels or i != len(data) or (
+        any(sum(x) != y for x, y in zip(self.counts, self.sizes[1:]))):
+      raise ValueError("Level trie sizes do not match its data.")
+
+    # Where each node's children start at the next level.
+    self.starts = [[0] + list(itertools.accumulate(x)) for x in self.counts]
+    self._set_symbols(symbols)
+
+  def _set_symbols(self, symbols):
+    self.symbols = list(symbols)
+    self.ids = dict(zip(self.symbols, range(len(self.symbols))))
+    self.symbol_lengths = sorted(set(map(len, self.symbols)))
+
+  # trie is a Trie of fixed length words, and ids map its symbols to their id.
+  @classmethod
+  def build(cls, trie, ids):
+    if len(ids) > 256:
+      raise ValueError("Level tries need at most 256 symbols.")
+    labels, counts = level_order(trie)
+    labels = [bytes(ids[k] for k in x) for x in labels]
+    symbols = sorted(ids, key=ids.get)
+    return cls(HEADER.pack(len(labels)) +
+      b''.join(SIZE.pack(len(x)) for x in labels) + b''.join(labels) +
+      b''.join(bytes(x) for x in counts), symbols)
+
+  def __len__(self):
+    return self.sizes[-1]
+
+  # Navigation, which is all a subclass storing the levels differently needs
+  # to provide.
+
+  # Symbol ids of nodes [lo, hi) at a depth.
+  def _labels(self, depth, lo, hi):
+    return self.labels[depth][lo:hi]
+
+  # The first of nodes [lo, hi) at a depth with the symbol id, or -1.
+  def _find_label(self, depth, lo, hi, symbol):
+    return self.labels[depth].find(symbol, lo, hi)
+
+  # Child counts of nodes [lo, hi) at a depth.
+  def _degrees(self, depth, lo, hi):
+    return self.counts[depth][lo:hi]
+
+  # Where node j's children start at the next depth, and node j - 1's end.
+  def _first_child(self, depth, j):
+    return self.starts[depth][j]
+
+  # The node at depth - 1 that node j at a depth is a child of.
+  def _parent(self, depth, j):
+    return bisect.bisect_right(self.starts[depth - 1], j) - 1
+
+  def words(self):
+    symbols = self.symbols
+    words = [symbols[x] for x in self._labels(0, 0, self.sizes[0])]
+    return self._expand(words, 0, 0, self.sizes[0])
+
+  # Words below nodes [lo, hi) at a depth, given the nodes' own words.
+  def _expand(self, words, depth, lo, hi):
+    symbols = self.symbols
+    while depth + 1 < len(self.sizes):
+      degrees = self._degrees(depth, lo, hi)
+      lo, hi = self._first_child(depth, lo), self._first_child(depth, hi)
+      depth += 1
+      parents = itertools.chain.from_iterable(
+        map(itertools.repeat, words, degrees))
+      words = list(map(operator.add, parents,
+        map(symbols.__getitem__, self._labels(depth, lo, hi))))
+    return words
+
+  # Nodes spelling out word from its i-th character, as (depth, j). Symbols of
+  # several characters may overlap, so each length is tried.
+  def _nodes(self, word, i=0, depth=0, lo=0, hi=None):
+    if hi is None:
+      hi = self.sizes[0]
+    for length in self.symbol_lengths:
+      symbol = self.ids.get(word[i:i + length])
+      if symbol is None:
+        continue
+      j = self._find_label(depth, lo, hi, symbol)
+      if j < 0:
+        continue
+      if i + length == len(word):
+        yield depth, j
+      elif depth + 1 < len(self.sizes):
+        yield from self._nodes(word, i + length, depth + 1,
+          self._first_child(depth, j), self._first_child(depth, j + 1))
+
+  # Indices are 1-based, as for WordleHuffmanTrie.
+  def index_of(self, word):
+    if len(self.symbol_lengths) == 1:
+      # Symbols can't overlap, so there is only one path to follow.
+      n = self.symbol_lengths[0]
+      if len(word) != n * len(self.sizes):
+        return None
+      lo, hi = 0, self.sizes[0]
+      for depth in range(len(self.sizes)):
+        if depth:
+          lo, hi = self._first_child(depth - 1, j), self._first_child(
+            depth - 1, j + 1)
+        symbol = self.ids.get(word[depth * n:depth * n + n])
+        j = -1 if symbol is None else self._find_label(depth, lo, hi, symbol)
+        if j < 0:
+          return None
+      return j + 1
+    for depth, j in self._nodes(word):
+      if depth + 1 == len(self.sizes):
+        return j + 1
+    return None
+
+  def word_at(self, index):
+    if not 0 < index <= len(self):
+      return None
+    j = index - 1
+    word = []
+    for depth in range(len(self.sizes) - 1, -1, -1):
+      word.append(self.symbols[self._labels(depth, j, j + 1)[0]])
+      if depth:
+        j = self._parent(depth, j)
+    return ''.join(reversed(word))
+
+  # Words starting with prefix, in index order.
+  def words_with_prefix(self, prefix):
+    if not prefix:
+      return self.words()
+    words = []
+    for depth, j in self._nodes(prefix):
+      words += self._expand([prefix], depth, j, j + 1)
+    return words
+
+  # Words matching a Query in index order, keeping only the nodes it allows
+  # at each level.
+  def query(self, query):
+    symbols = self.symbols
+    nodes = [(j, symbols[x])
+      for j, x in enumerate(self._labels(0, 0, self.sizes[0]))]
+    nodes = [(j, word) for j, word in nodes if query.allows(word)]
+    for depth in range(1, len(self.sizes)):
+      children = []
+      for j, word in nodes:
+        lo = self._first_child(depth - 1, j)
+        hi = self._first_child(depth - 1, j + 1)
+        for k, x in enumerate(self._labels(depth, lo, hi), lo):
+          child = word + symbols[x]
+          if query.allows(child, len(word)):
+            children.append((k, child))
+      nodes = children
+    return [word for j, word in nodes if query.matches(word)]
+
+  def tobytes(self):
+    return (HEADER.pack(len(self.sizes)) +
+      b''.join(SIZE.pack(x) for x in self.sizes) + b''.join(self.labels) +
+      b''.join(self.counts))
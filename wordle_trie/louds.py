@@ -0,0 +1,181 @@
+import array
+import struct
+
+from .bit_reader import BitReader, from_bin, prefix_table, to_bin
+from .levels import LevelTrie, level_order
+
+# Level order unary degree sequence (LOUDS) trie for fixed length
+# dictionaries, as stored in a container's LOUD section beside a Huffman table
+# per level in HUFF:
+#
+#   levels   B  number of levels, the word length in symbols
+#   sizes    levels * (nodes I, label bits I)
+#   bitmaps  for each level but the last, a 1 per child and a 0 ending each
+#            node, padded to whole 64 bit words
+#   labels   for each level, its nodes' symbols coded with the level's table,
+#            padded to a byte
+#   samples  for each level, the bit offset (I) of every SAMPLE_RATE-th label
+#
+# Nodes are in level order, so node j's children are the ones between the
+# j-th and (j + 1)-th zeros of its level's bitmap, found with select, and its
+# parent is the number of zeros before its one. Labels are decoded from the
+# nearest sample, so moving along an edge costs the same wherever it is in
+# the trie, rather than decoding everything before it as in the depth first
+# payload. Rank and select directories are built on load.
+HEADER = struct.Struct('>B')
+SIZE = struct.Struct('>II')
+SAMPLE = struct.Struct('>I')
+SAMPLE_RATE = 64
+
+POPCOUNT = bytes(bin(x).count('1') for x in range(256))
+
+def _popcount(x):
+  return bin(x).count('1')
+
+def _select_in_word(x, k):
+  # Position (from the most significant bit) of the k-th set bit of x.
+  for shift in range(56, -8, -8):
+    byte = x >> shift & 0xff
+    if k < POPCOUNT[byte]:
+      for bit in range(8):
+        if byte & (0x80 >> bit):
+          if not k:
+            return 56 - shift + bit
+          k -= 1
+    k -= POPCOUNT[byte]
+  raise ValueError("Select past the end of the word.")
+
+class Bitmap:
+  # Select over a bitmap of 64 bit words, most significant bit first, with the
+  # ones before each word (a rank directory) and the word holding every
+  # SAMPLE_RATE-th one and zero to start from.
+  def __init__(self, data, size):
+    self.size = size
+    self.bin = to_bin(data)[:size]
+    self.words = [int.from_bytes(data[i:i + 8], 'big')
+      for i in range(0, len(data), 8)]
+    self.ranks = array.array('I')
+    self.one_samples = array.array('I')
+    self.zero_samples = array.array('I')
+    ones = 0
+    for i, word in enumerate(self.words):
+      self.ranks.append(ones)
+      count = _popcount(word)
+      while len(self.one_samples) * SAMPLE_RATE < ones + count:
+        self.one_samples.append(i)
+      zeros = min(64, size - i * 64) - count
+      while len(self.zero_samples) * SAMPLE_RATE < i * 64 - ones + zeros:
+        self.zero_samples.append(i)
+      ones += count
+    self.ranks.append(ones)
+    self.ones = ones
+
+  # Position of the k-th one, counting from zero.
+  def select1(self, k):
+    w = self.one_samples[k // SAMPLE_RATE]
+    while self.ranks[w + 1] <= k:
+      w += 1
+    return w * 64 + _select_in_word(self.words[w], k - self.ranks[w])
+
+  # Position of the k-th zero, counting from zero.
+  def select0(self, k):
+    w = self.zero_samples[k // SAMPLE_RATE]
+    while (w + 1) * 64 - self.ranks[w + 1] <= k:
+      w += 1
+    return w * 64 + _select_in_word(~self.words[w] & (1 << 64) - 1,
+      k - (w * 64 - self.ranks[w]))
+
+class LoudsTrie(LevelTrie):
+  # codes are the prefix_tables of each level's Huffman table, as read by
+  # WordleHuffmanTrie, and symbols the alphabet in id order.
+  def __init__(self, data, symbols, codes):
+    data = memoryview(data)
+    if len(data) < HEADER.size:
+      raise ValueError("Truncated LOUDS trie header.")
+    num_levels, = HEADER.unpack_from(data)
+    i = HEADER.size
+    sizes = [SIZE.unpack_from(data, i + j * SIZE.size)
+      for j in range(num_levels)]
+    i += SIZE.size * num_levels
+    if not num_levels or len(codes) < num_levels:
+      raise ValueError("Expected a Huffman table for each of {} levels.".format(
+        num_levels))
+    self.sizes = [nodes for nodes, label_bits in sizes]
+    self.bitmaps = []
+    for nodes, children in zip(self.sizes, self.sizes[1:]):
+      length = (nodes + children + 63) // 64 * 8
+      self.bitmaps.append(Bitmap(data[i:i + length], nodes + children))
+      i += length
+    self.readers = []
+    for nodes, label_bits in sizes:
+      length = (label_bits + 7) // 8
+      self.readers.append(BitReader(data[i:i + length]))
+      i += length
+    self.samples = []
+    for nodes in self.sizes:
+      count = (nodes + SAMPLE_RATE - 1) // SAMPLE_RATE
+      self.samples.append(struct.unpack_from('>{}I'.format(count), data, i))
+      i += SAMPLE.size * count
+    if i != len(data) or any(bitmap.ones != nodes
+        for bitmap, nodes in zip(self.bitmaps, self.sizes[1:])):
+      raise ValueError("LOUDS trie sizes do not match its data.")
+    self.data = data
+    self.codes = codes[:num_levels]
+    self._set_symbols(symbols)
+
+  # trie is a Trie of fixed length words, tables the Huffman code of each
+  # level (as from build_huffmans) and ids map its symbols to their id.
+  @classmethod
+  def build(cls, trie, tables, ids):
+    labels, counts = level_order(trie)
+    bitmaps = [from_bin(''.join('1' * x + '0' for x in level).ljust(
+      (len(level) + sum(level) + 63) // 64 * 64, '0')) for level in counts]
+    streams = []
+    samples = []
+    for level, table in zip(labels, tables):
+      code = {k: ''.join(map(str, v)) for k, v in table.items()}
+      stream = []
+      offset = 0
+      for j, symbol in enumerate(level):
+        if not j % SAMPLE_RATE:
+          samples.append(SAMPLE.pack(offset))
+        stream.append(code[symbol])
+        offset += len(code[symbol])
+      streams.append(''.join(stream))
+    return cls(HEADER.pack(len(labels)) +
+      b''.join(SIZE.pack(len(x), len(y)) for x, y in zip(labels, streams)) +
+      b''.join(bitmaps) + b''.join(from_bin(x) for x in streams) +
+      b''.join(samples), sorted(ids, key=ids.get), [prefix_table(
+        {''.join(map(str, v)): ids[k] for k, v in table.items()})
+        for table in tables])
+
+  def _labels(self, depth, lo, hi):
+    reader = self.readers[depth]
+    code = self.codes[depth]
+    reader.i = self.samples[depth][lo // SAMPLE_RATE]
+    for j in range(lo % SAMPLE_RATE):
+      reader.read_code(code)
+    return [reader.read_code(code) for j in range(hi - lo)]
+
+  def _find_label(self, depth, lo, hi, symbol):
+    labels = self._labels(depth, lo, hi)
+    return lo + labels.index(symbol) if symbol in labels else -1
+
+  def _degrees(self, depth, lo, hi):
+    bitmap = self.bitmaps[depth]
+    start = bitmap.select0(lo - 1) + 1 if lo else 0
+    end = bitmap.select0(hi - 1) + 1 if hi else 0
+    return [len(x) for x in bitmap.bin[start:end].split('0')[:-1]]
+
+  def _first_child(self, depth, j):
+    # The children of nodes before j, the ones before node j - 1's zero.
+    if not j:
+      return 0
+    return self.bitmaps[depth].select0(j - 1) - (j - 1)
+
+  def _parent(self, depth, j):
+    # Zeros before its one.
+    return self.bitmaps[depth - 1].select1(j) - j
+
+  def tobytes(self):
+    return bytes(self.data)
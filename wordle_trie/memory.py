@@ -0,0 +1,62 @@
+import array
+import mmap
+import sys
+import types
+
+# Objects whose size is all their own, or (maps) whose data is a file rather
+# than heap. memoryviews are followed to the object they view, unless that is a
+# map.
+LEAVES = (str, bytes, bytearray, int, float, complex, bool, type(None),
+  array.array, mmap.mmap, type, types.FunctionType, types.MethodType,
+  types.ModuleType)
+
+# Heap bytes retained by obj and everything it references, by sys.getsizeof,
+# counting each object once. seen is shared between calls to count objects
+# referenced from several places only the first time.
+def deep_sizeof(obj, seen=None):
+  if seen is None:
+    seen = set()
+  total = 0
+  stack = [obj]
+  while stack:
+    x = stack.pop()
+    if id(x) in seen:
+      continue
+    seen.add(id(x))
+    total += sys.getsizeof(x)
+    if isinstance(x, LEAVES):
+      continue
+    if isinstance(x, memoryview):
+      # A view may be the only reference to the buffer it keeps alive.
+      try:
+        stack.append(x.obj)
+      except ValueError:
+        # Released.
+        pass
+      continue
+    if isinstance(x, dict):
+      stack.extend(x.keys())
+      stack.extend(x.values())
+    elif isinstance(x, (list, tuple, set, frozenset)):
+      stack.extend(x)
+    else:
+      if hasattr(x, '__dict__'):
+        stack.append(x.__dict__)
+      for cls in type(x).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+          if hasattr(x, name):
+            stack.append(getattr(x, name))
+  return total
+
+# Retained size of each of obj's attributes, and their total.
+def attribute_sizes(obj):
+  seen = {id(obj), id(vars(obj))}
+  sizes = {name: deep_sizeof(value, seen) for name, value in vars(obj).items()}
+  sizes['total'] = sum(sizes.values()) + sys.getsizeof(obj)
+  return sizes
+
+# Gives the lookup structures (filter, perfect hash, levels and schedule) a
+# memory_report of their attribute_sizes.
+class MemoryReport:
+  def memory_report(self):
+    return attribute_sizes(self)
@@ -0,0 +1,133 @@
+import array
+import hashlib
+import struct
+
+from .bit_reader import from_bin
+from .memory import MemoryReport
+
+# Minimal perfect hash (BBHash) with a value per key, as stored in a
+# container's MPHF section:
+#
+#   levels  B  number of levels
+#   count   I  number of keys
+#   width   B  bits per value
+#   sizes   levels * I, bits in each level, each a multiple of 64
+#   bits    the levels' bitmaps, most significant bit first
+#   values  count * width bits, one per key in slot order, padded to a byte
+#
+# Keys hash into a bitmap per level, and those colliding with another key move
+# on to the next level. A set bit marks a key that was alone, and the key's
+# slot is the number of set bits before it, counted with a rank sample per
+# 64 bit word. The bitmaps are about 3 bits per key at gamma 1.
+HEADER = struct.Struct('>BIB')
+SIZE = struct.Struct('>I')
+MAX_LEVELS = 64
+MASK = (1 << 64) - 1
+
+def _hash(key):
+  digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+  return int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big')
+
+def _position(h, level, size):
+  # splitmix64's finaliser, so that keys colliding at one level are unlikely
+  # to collide again at the next.
+  x = (h[0] + level * h[1]) & MASK
+  x = (x ^ (x >> 30)) * 0xbf58476d1ce4e5b9 & MASK
+  x = (x ^ (x >> 27)) * 0x94d049bb133111eb & MASK
+  return (x ^ (x >> 31)) % size
+
+def _popcount(x):
+  return bin(x).count('1')
+
+class PerfectHash(MemoryReport):
+  def __init__(self, data):
+    self.data = memoryview(data)
+    num_levels, self.count, self.width = HEADER.unpack_from(self.data)
+    i = HEADER.size
+    self.sizes = [SIZE.unpack_from(self.data, i + j * SIZE.size)[0]
+      for j in range(num_levels)]
+    i += SIZE.size * num_levels
+    num_bytes = sum(self.sizes) // 8
+    self.bits = self.data[i:i + num_bytes]
+    self.values = self.data[i + num_bytes:]
+    if len(self.bits) != num_bytes or (
+        len(self.values) != (self.count * self.width + 7) // 8):
+      raise ValueError("Truncated perfect hash.")
+
+    # Set bits before each 64 bit word.
+    self.ranks = array.array('I')
+    total = 0
+    for j in range(0, num_bytes, 8):
+      self.ranks.append(total)
+      total += _popcount(int.from_bytes(self.bits[j:j + 8], 'big'))
+    if total != self.count:
+      raise ValueError("Perfect hash has {} slots for {} keys.".format(
+        total, self.count))
+
+  # Maps each (unique) key to its value, values must fit in 255 bits.
+  @classmethod
+  def build(cls, keys, values, gamma=1.0):
+    keys = list(keys)
+    values = list(values)
+    hashes = [_hash(key) for key in keys]
+    remaining = list(range(len(keys)))
+    sizes = []
+    bitmaps = []
+    placed = []
+    offset = 0
+    while remaining:
+      if len(sizes) == MAX_LEVELS:
+        raise ValueError("Could not place every key, are they unique?")
+      level = len(sizes)
+      size = max(64, (int(len(remaining) * gamma) + 63) // 64 * 64)
+      positions = [_position(hashes[x], level, size) for x in remaining]
+      seen = bytearray(size)
+      for position in positions:
+        if seen[position] < 2:
+          seen[position] += 1
+      bitmap = bytearray(size // 8)
+      collided = []
+      for x, position in zip(remaining, positions):
+        if seen[position] == 1:
+          bitmap[position >> 3] |= 0x80 >> (position & 7)
+          placed.append((offset + position, x))
+        else:
+          collided.append(x)
+      sizes.append(size)
+      bitmaps.append(bytes(bitmap))
+      offset += size
+      remaining = collided
+
+    # Slots follow the order of the set bits.
+    placed.sort()
+    width = max([1] + [value.bit_length() for value in values])
+    packed = from_bin(''.join(
+      format(values[x], '0{}b'.format(width)) for position, x in placed))
+    return cls(HEADER.pack(len(sizes), len(keys), width) +
+      b''.join(SIZE.pack(x) for x in sizes) + b''.join(bitmaps) + packed)
+
+  # Keys that were not built in map to an arbitrary value, or to None if they
+  # miss every level.
+  def get(self, key, default=None):
+    h = _hash(key)
+    offset = 0
+    for level, size in enumerate(self.sizes):
+      i = offset + _position(h, level, size)
+      j = i >> 6
+      word = int.from_bytes(self.bits[j * 8:j * 8 + 8], 'big')
+      if word >> (63 - (i & 63)) & 1:
+        return self._value(self.ranks[j] + _popcount(word >> (64 - (i & 63))))
+      offset += size
+    return default
+
+  def _value(self, slot):
+    start = slot * self.width
+    first, last = start >> 3, (start + self.width + 7) >> 3
+    chunk = int.from_bytes(self.values[first:last], 'big')
+    return chunk >> ((last << 3) - start - self.width) & ((1 << self.width) - 1)
+
+  def bits_per_key(self):
+    return sum(self.sizes) / max(1, self.count)
+
+  def tobytes(self):
+    return bytes(self.data)
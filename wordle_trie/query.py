@@ -0,0 +1,55 @@
+# Constraints for WordleHuffmanTrie.query, checked a node at a time so whole
+# subtrees can be skipped as soon as their prefix rules them out.
+class Query:
+  # pattern is a string with '?' (or '.') for any letter, e.g. 'cr?n?', or a
+  # sequence with a string (or set) of the letters allowed at each position,
+  # None for any. A pattern also fixes the length of the words. prefix is
+  # the letters words start with, include letters they must contain and
+  # exclude letters they must not.
+  def __init__(self, prefix='', pattern=None, include='', exclude=''):
+    positions = []
+    if pattern is not None:
+      for allowed in pattern:
+        if allowed in ('?', '.', None):
+          positions.append(None)
+        else:
+          positions.append(frozenset(allowed))
+    for i, letter in enumerate(prefix):
+      if i == len(positions):
+        positions.append(None)
+      if positions[i] is None:
+        positions[i] = frozenset(letter)
+      else:
+        positions[i] &= {letter}
+    self.positions = positions
+    self.length = None if pattern is None else len(pattern)
+    self.include = frozenset(include)
+    self.exclude = frozenset(exclude)
+    if self.length is not None and len(prefix) > self.length:
+      # Nothing can match, so allow nothing from the first letter.
+      self.positions = [frozenset()]
+
+  # Whether words starting with word may match, given that word[:start] was
+  # already allowed.
+  def allows(self, word, start=0):
+    positions = self.positions
+    for i in range(start, len(word)):
+      letter = word[i]
+      if letter in self.exclude:
+        return False
+      if i < len(positions) and positions[i] is not None and (
+          letter not in positions[i]):
+        return False
+    if self.length is not None:
+      if len(word) > self.length:
+        return False
+      # Not enough letters left for the ones still missing.
+      if len(self.include.difference(word)) > self.length - len(word):
+        return False
+    return True
+
+  # Whether an allowed word matches in full.
+  def matches(self, word):
+    return (len(word) >= len(self.positions) and
+      (self.length is None or len(word) == self.length) and
+      self.include.issubset(word))
@@ -0,0 +1,65 @@
+import struct
+
+from .bit_reader import from_bin
+from .memory import MemoryReport
+
+# Answer schedule, as stored in a container's SCHD section or written on its
+# own by `encode --schedule`:
+#
+#   day_offset  I  day of the first answer, in days since the epoch
+#   days        I  number of days scheduled
+#   width       B  bits per answer
+#   indices     days * width bits, each day's (1-based) word index, most
+#               significant bit first and padded to a byte
+#
+# Unlike answers.bin (and the ANSW section) the indices are exactly as wide
+# as the largest index needs, 14 bits for the Wordle dictionary rather than
+# 16, and there is no 255 day limit, so the whole 2,315 answer schedule is
+# 4,061 bytes. A day's answer is the one field at a known bit offset.
+HEADER = struct.Struct('>IIB')
+
+class AnswerSchedule(MemoryReport):
+  def __init__(self, data):
+    self.data = memoryview(data)
+    if len(self.data) < HEADER.size:
+      raise ValueError("Truncated answer schedule header.")
+    self.day_offset, self.days, self.width = HEADER.unpack_from(self.data)
+    if not 0 < self.width <= 32 or len(self.data) != HEADER.size + (
+        self.days * self.width + 7) // 8:
+      raise ValueError("Answer schedule size does not match its {} days.".format(
+        self.days))
+    self.mask = (1 << self.width) - 1
+
+  # indices are the word index of each day's answer from day_offset, out of
+  # num_words.
+  @classmethod
+  def build(cls, indices, day_offset, num_words):
+    width = max(1, num_words.bit_length())
+    fields = []
+    for index in indices:
+      if not 0 < index <= num_words:
+        raise ValueError("Answer index {} is not a word.".format(index))
+      fields.append(format(index, '0{}b'.format(width)))
+    return cls(HEADER.pack(day_offset, len(fields), width) +
+      from_bin(''.join(fields)))
+
+  def __len__(self):
+    return self.days
+
+  # The word index of a day's answer, or None if the day is not scheduled.
+  def answer_for_day(self, day):
+    i = day - self.day_offset
+    if not 0 <= i < self.days:
+      return None
+    bit = i * self.width
+    start = HEADER.size + bit // 8
+    end = HEADER.size + (bit + self.width + 7) // 8
+    field = int.from_bytes(self.data[start:end], 'big')
+    return field >> (end - start) * 8 - bit % 8 - self.width & self.mask
+
+  def indices(self):
+    return [self.answer_for_day(day)
+      for day in range(self.day_offset, self.day_offset + self.days)]
+
+  def tobytes(self):
+    return bytes(self.data)
@@ -0,0 +1,88 @@
+import collections
+
+class Trie:
+  def __init__(self, words, word_func=None, variable_length=False):
+    self.trie = {}
+    for i, word in enumerate(words):
+      node = self.trie
+      if word_func:
+        word = word_func(word)
+      for letter in word:
+        if letter not in node:
+          node[letter] = {}
+        node = node[letter]
+      if variable_length:
+        node['END'] = {}
+
+  # Words in the order they are encoded, so a word's position is its index.
+  def words(self):
+    return list(self._words(self.trie, ''))
+
+  def _words(self, trie, prefix):
+    for k, v in trie.items():
+      if k == 'END':
+        continue
+      if 'END' in v or not v:
+        yield prefix + k
+      yield from self._words(v, prefix + k)
+
+  # The child count of each node below the root in preorder, as the payload
+  # writes them. END marks a node as ending a word, it is not a child.
+  def count_children(self):
+    children = []
+    self._count_children(self.trie, children)
+    return children
+
+  # Child counts and how often each occurs, counted in the order
+  # count_children lists them without building the list.
+  def child_counts(self):
+    counts = collections.Counter()
+    self._child_counts(self.trie, counts)
+    return counts
+
+  def _child_counts(self, trie, counts):
+    for k, v in trie.items():
+      if k == 'END':
+        continue
+      counts[len(v) - ('END' in v)] += 1
+      self._child_counts(v, counts)
+
+  # Symbols at a depth and how often each occurs, as the payload writes them,
+  # so without END.
+  def counts_at_depth(self, target_depth):
+    counts = collections.Counter()
+    self._counts_at_depth(self.trie, target_depth, counts)
+    return counts
+
+  def _counts_at_depth(self, trie, target_depth, counts, depth=0):
+    if depth == target_depth:
+      counts.update(k for k in trie if k != 'END')
+      return
+    for v in trie.values():
+      self._counts_at_depth(v, target_depth, counts, depth+1)
+
+  def leaves_at_depth(self, target_depth):
+    return self._leaves_at_depth(self.trie, target_depth)
+
+  def _leaves_at_depth(self, trie, target_depth, depth=0):
+    if depth == target_depth:
+      return trie.keys()
+    keys = []
+    for v in trie.values():
+      keys += self._leaves_at_depth(v, target_depth, depth+1)
+    return keys
+
+  def _count_children(self, trie, children):
+    for k, v in trie.items():
+      if k == 'END':
+        continue
+      children.append(len(v) - ('END' in v))
+      self._count_children(v, children)
+
+  def _max_children(self, trie):
+    max_len = 0
+    for k, v in trie.items():
+      v_len = len(v)
+      max_len = max(max_len, v_len)
+      max_len = max(max_len, self._max_children(v))
+    return max_len
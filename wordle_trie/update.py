@@ -0,0 +1,346 @@
+import collections
+import struct
+import zlib
+
+from . import container
+from .bit_reader import from_bin, to_bin
+from .encoder import (
+  INDEX_ENTRY,
+  WordleHuffmanTrie,
+  build_huffmans,
+  decode_answers,
+  encode_answers,
+  encode_skips,
+  table_sizes,
+)
+from .filter import BloomFilter
+from .mph import PerfectHash
+from .schedule import AnswerSchedule
+from .trie import Trie
+
+# Patch layout, all integers big-endian:
+#
+#   magic       4s  b'WTPT'
+#   version     B   PATCH_VERSION
+#   old length  I   bytes
+#   old crc     I   CRC32 of the file the patch applies to
+#   new length  I   bytes
+#   new crc     I   CRC32 of the patched file
+#   count       I   number of ops
+#   ops         OP_COPY: start I, length I
+#                 Copy length bits of the old file, starting at bit start.
+#               OP_DATA: length I, then the bits padded to whole bytes
+#
+# Ops address bits rather than bytes because a re-encoded root subtree shifts
+# everything after it by an arbitrary number of bits.
+PATCH_MAGIC = b'WTPT'
+PATCH_VERSION = 1
+
+OP_COPY = 0
+OP_DATA = 1
+
+PATCH_HEADER = struct.Struct('>4sBIIIII')
+COPY = struct.Struct('>BII')
+DATA = struct.Struct('>BI')
+
+class PatchError(ValueError):
+  pass
+
+def _add_piece(pieces, piece):
+  last = pieces[-1] if pieces else None
+  if piece[0] == OP_COPY:
+    if not piece[2]:
+      return
+    if last and last[0] == OP_COPY and last[1] + last[2] == piece[1]:
+      pieces[-1] = (OP_COPY, last[1], last[2] + piece[2])
+      return
+  else:
+    if not piece[1]:
+      return
+    if last and last[0] == OP_DATA:
+      pieces[-1] = (OP_DATA, last[1] + piece[1])
+      return
+  pieces.append(piece)
+
+def make_patch(old, new, pieces):
+  ops = []
+  for piece in pieces:
+    _add_piece(ops, piece)
+  body = b''
+  for op in ops:
+    if op[0] == OP_COPY:
+      body += COPY.pack(*op)
+    else:
+      body += DATA.pack(OP_DATA, len(op[1])) + from_bin(op[1])
+  return PATCH_HEADER.pack(PATCH_MAGIC, PATCH_VERSION, len(old),
+    zlib.crc32(old), len(new), zlib.crc32(new), len(ops)) + body
+
+def apply_patch(old, patch):
+  old = bytes(old)
+  patch = memoryview(patch)
+  (magic, version, old_length, old_crc, new_length, new_crc,
+    count) = PATCH_HEADER.unpack_from(patch)
+  if magic != PATCH_MAGIC:
+    raise PatchError("Not a patch, bad magic {!r}.".format(magic))
+  if version != PATCH_VERSION:
+    raise PatchError("Unsupported patch version {}.".format(version))
+  if len(old) != old_length or zlib.crc32(old) != old_crc:
+    raise PatchError("Patch does not apply to this file.")
+
+  bits = to_bin(old)
+  out = []
+  i = PATCH_HEADER.size
+  for op in range(count):
+    if patch[i] == OP_COPY:
+      kind, start, length = COPY.unpack_from(patch, i)
+      i += COPY.size
+      out.append(bits[start:start + length])
+    elif patch[i] == OP_DATA:
+      kind, length = DATA.unpack_from(patch, i)
+      i += DATA.size
+      num_bytes = (length + 7) // 8
+      out.append(to_bin(patch[i:i + num_bytes])[:length])
+      i += num_bytes
+    else:
+      raise PatchError("Unknown patch op {}.".format(patch[i]))
+
+  new = from_bin(''.join(out))
+  if len(new) != new_length or zlib.crc32(new) != new_crc:
+    raise PatchError("Patched file does not match the expected checksum.")
+  return new
+
+def _stats(trie, variable_length, depth=0, symbols=None, counts=None):
+  # Symbols per depth and child counts exactly as _encode_trie writes them.
+  symbols = symbols if symbols is not None else collections.defaultdict(
+    collections.Counter)
+  counts = counts if counts is not None else collections.Counter()
+  for k, v in trie.items():
+    if variable_length and k == 'END':
+      continue
+    if variable_length or v:
+      counts[len(v) - (1 if variable_length and 'END' in v else 0)] += 1
+    symbols[depth][k] += 1
+    _stats(v, variable_length, depth+1, symbols, counts)
+  return symbols, counts
+
+def _payload_bits(symbols, counts, depth_codes, count_codes, variable_length):
+  # Returns None if any symbol or child count has no code.
+  total = 0
+  for depth, counter in symbols.items():
+    if depth >= len(depth_codes):
+      return None
+    for k, n in counter.items():
+      if k not in depth_codes[depth]:
+        return None
+      total += n * len(depth_codes[depth][k])
+      if variable_length:
+        total += n
+  for k, n in counts.items():
+    if k not in count_codes:
+      return None
+    total += n * len(count_codes[k])
+  return total
+
+def _tables_bits(tables, num_symbols, variable_length):
+  tables = [{k: v for k, v in table.items()
+    if not (variable_length and k == 'END')} for table in tables]
+  table_size, word_size = table_sizes(tables, num_symbols)
+  total = 40
+  for table in tables:
+    total += table_size
+    for code in table.values():
+      total += word_size + 8 + len(code)
+  return total
+
+def update(data, add=(), remove=(), max_growth=0.01, variable_length=False):
+  # Applies a delta to an encoded dictionary (container or raw), returning the
+  # new file and a patch from the old one. Tables are reused, and only changed
+  # root subtrees re-encoded, unless that costs more than max_growth over
+  # rebuilding everything. variable_length is only needed for raw files.
+  data = bytes(data)
+  old = WordleHuffmanTrie(variable_length=variable_length)
+  words = old.decode(data)
+  if old.chunks:
+    raise ValueError("Chunked containers cannot be updated, re-encode them.")
+  if old.shared is not None or old.levels is not None:
+    raise ValueError("Dictionaries using shared tables, or the bytes or louds "
+      "layout, cannot be updated, re-encode them.")
+  if any(len(x) != 1 for x in old.symbols):
+    raise ValueError("Updates need an alphabet of single characters.")
+  for word in add:
+    if not word or any(x not in old.symbols for x in word):
+      raise ValueError("Cannot add {!r}, it is not in the alphabet.".format(word))
+    if not old.variable_length and len(word) != old.num_tables - 1:
+      raise ValueError("Cannot add {!r} to a fixed length dictionary.".format(
+        word))
+
+  # Group words by root subtree, keeping the existing order.
+  groups = collections.OrderedDict()
+  for i, (symbol, offset, count) in enumerate(old.offsets):
+    end, last = old.payload_size, len(words)
+    if i + 1 < len(old.offsets):
+      end, last = old.offsets[i + 1][1:]
+    groups[old.symbols[symbol]] = {
+      'bits': (old.i + offset, end - offset),
+      'words': words[count:last],
+      'changed': False,
+    }
+
+  remove = set(remove) - set(add)
+  add = set(add) - set(words)
+  for word in remove:
+    if word and word[0] in groups and word in groups[word[0]]['words']:
+      group = groups[word[0]]
+      group['words'] = [x for x in group['words'] if x != word]
+      group['changed'] = True
+  for word in sorted(add):
+    if word[0] not in groups:
+      groups[word[0]] = {'bits': None, 'words': [], 'changed': True}
+    group = groups[word[0]]
+    group['words'] = sorted(group['words'] + [word])
+    group['changed'] = True
+  roots = [k for k in groups if groups[k]['words']]
+  if any(groups[k]['bits'] is None for k in roots):
+    roots = sorted(roots)
+  new_words = [word for root in roots for word in groups[root]['words']]
+
+  # Compare reusing the tables with rebuilding them for the new words.
+  variable_length = old.variable_length
+  if not new_words:
+    raise ValueError("Cannot remove every word.")
+  trie = Trie(new_words, variable_length=variable_length)
+  symbols, counts = _stats(trie.trie, variable_length)
+  symbol_ids = dict(zip(old.symbols, range(len(old.symbols))))
+  old_codes = [{old.symbols[v]: k for k, v in table.items()}
+    for table in old.tables[:-1]]
+  old_counts = {v: k for k, v in old.tables[-1].items()}
+  reuse_bits = _payload_bits(symbols, counts, old_codes, old_counts,
+    variable_length)
+  reuse = reuse_bits is not None
+  if reuse:
+    huffs = build_huffmans(trie, old.num_tables - 1, variable_length)
+    rebuild_bits = _payload_bits(symbols, counts,
+      [huff.code for huff in huffs[:-1]], huffs[-1].code, variable_length)
+    rebuild_bits += _tables_bits([huff.code for huff in huffs],
+      len(old.symbols), variable_length)
+    reuse_bits += old.header_size + old.huff_size
+    reuse = reuse_bits <= rebuild_bits * (1 + max_growth)
+
+  if not reuse:
+    new = WordleHuffmanTrie(variable_length=variable_length)
+    new.encode(new_words, old.symbols)
+    if old.container is None:
+      out = new.tobytes()
+    else:
+      out = new.tocontainer(answers=_answers(old, words, new_words),
+        schedule=_schedule(old, words, new_words),
+        index=container.INDEX in old.container,
+        filter_rate=None if old.filter is None else old.filter.rate,
+        mph=old.mph is not None, skips=container.SKIPS in old.container)
+    return out, make_patch(data, out, [(OP_DATA, to_bin(out))])
+
+  # Re-encode only changed subtrees, pieces are relative to the payload.
+  payload = []
+  offsets = []
+  position = 0
+  count = 0
+  for root in roots:
+    group = groups[root]
+    offsets.append((symbol_ids[root], position, count))
+    if group['changed'] or group['bits'] is None:
+      bits = old.encode_payload(group['words'])
+      payload.append((OP_DATA, bits))
+      position += len(bits)
+    else:
+      payload.append((OP_COPY,) + group['bits'])
+      position += group['bits'][1]
+    count += len(group['words'])
+
+  old_bits = to_bin(data)
+  header = old_bits[:old.header_size] if old.container is None else to_bin(
+    old.container.section(container.TABLES))[:old.header_size]
+  header = header[:24] + format(len(roots), '016b')
+  tables_start = 0 if old.container is None else (
+    old.container.sections[container.TABLES][0] * 8)
+
+  if old.container is None:
+    pieces = [(OP_DATA, header), (OP_COPY, old.header_size, old.huff_size)]
+    pieces += payload
+    size = old.header_size + old.huff_size + position
+    pieces.append((OP_DATA, '0' * (-size % 8)))
+    out = from_bin(''.join(_render(old_bits, pieces)))
+    return out, make_patch(data, out, pieces)
+
+  # Containers are rebuilt section by section, copying unchanged ones.
+  payl_start = old.container.sections[container.PAYLOAD][0] * 8
+  payload = [(op[0], op[1] + payl_start, op[2]) if op[0] == OP_COPY else op
+    for op in payload]
+  payload.append((OP_DATA, '0' * (-position % 8)))
+  sections = []
+  section_pieces = {}
+  for tag in old.container.sections:
+    offset, length, crc = old.container.sections[tag]
+    if tag == container.TABLES:
+      table_bits = to_bin(old.container.section(tag))
+      pieces = [(OP_DATA, header),
+        (OP_COPY, tables_start + old.header_size, len(table_bits) - len(header))]
+    elif tag == container.PAYLOAD:
+      pieces = payload
+    elif tag == container.INDEX:
+      index = b''.join(INDEX_ENTRY.pack(*x) for x in offsets)
+      pieces = [(OP_DATA, to_bin(index))]
+    elif tag == container.FILTER:
+      bloom = BloomFilter.build(new_words, old.filter.rate)
+      pieces = [(OP_DATA, to_bin(bloom.tobytes()))]
+    elif tag == container.PERFECT_HASH:
+      mph = PerfectHash.build(new_words, range(1, len(new_words) + 1))
+      pieces = [(OP_DATA, to_bin(mph.tobytes()))]
+    elif tag == container.SKIPS:
+      skips = encode_skips(old.payload_skips(new_words))
+      pieces = [(OP_DATA, to_bin(skips))]
+    elif tag in (container.ANSWERS, container.SCHEDULE):
+      if tag == container.ANSWERS:
+        answers = _answers(old, words, new_words)
+      else:
+        answers = _schedule(old, words, new_words)
+      if answers == bytes(old.container.section(tag)):
+        pieces = [(OP_COPY, offset * 8, length * 8)]
+      else:
+        pieces = [(OP_DATA, to_bin(answers))]
+    else:
+      pieces = [(OP_COPY, offset * 8, length * 8)]
+    sections.append((tag, from_bin(''.join(_render(old_bits, pieces)))))
+    section_pieces[tag] = pieces
+  out = container.write_container(sections, flags=old.container.flags)
+
+  table_size = container.HEADER.size + container.ENTRY.size * len(sections)
+  pieces = [(OP_DATA, to_bin(out[:table_size]))]
+  for tag, section in sections:
+    pieces += section_pieces[tag]
+  return out, make_patch(data, out, pieces)
+
+def _answers(old, words, new_words):
+  if old.container is None or container.ANSWERS not in old.container:
+    return None
+  day_offset, indices = decode_answers(old.container.section(container.ANSWERS))
+  return encode_answers(_reindex(indices, words, new_words), day_offset,
+    len(new_words))
+
+def _schedule(old, words, new_words):
+  if old.schedule is None:
+    return None
+  return AnswerSchedule.build(_reindex(old.schedule.indices(), words,
+    new_words), old.schedule.day_offset, len(new_words)).tobytes()
+
+def _reindex(indices, words, new_words):
+  new_indices = dict(zip(new_words, range(1, len(new_words) + 1)))
+  if any(words[x - 1] not in new_indices for x in indices):
+    raise ValueError("Cannot remove a word that is a scheduled answer.")
+  return [new_indices[words[x - 1]] for x in indices]
+
+def _render(bits, pieces):
+  for piece in pieces:
+    if piece[0] == OP_COPY:
+      yield bits[piece[1]:piece[1] + piece[2]]
+    else:
+      yield piece[1]